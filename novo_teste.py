@@ -1,5 +1,7 @@
 # --- IMPORTS ---
 import os
+import csv
+import io
 import logging
 import pandas as pd
 import psycopg2
@@ -10,6 +12,7 @@ import yaml
 import pandera as pa
 from pandera.errors import SchemaError
 from io import StringIO
+from collections.abc import Iterator
 import sv_ttk
 from tkinter import Tk, filedialog, messagebox, ttk, Checkbutton, BooleanVar, StringVar, Canvas
 from tkinter.scrolledtext import ScrolledText
@@ -24,6 +27,36 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 load_dotenv()
 
 
+# --- ADAPTADOR DE REGISTROS PARA O COPY ---
+class CsvRecordStream(io.TextIOBase):
+    """Expõe um iterador de tuplas como um arquivo CSV lido sob demanda pelo COPY, sem materializar tudo em memória."""
+
+    def __init__(self, records):
+        self._records = iter(records)
+        self._buffer = StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator='\n')
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        # Escreve linhas no buffer até ter o suficiente para atender a leitura pedida pelo psycopg2
+        while size is None or size < 0 or self._buffer.tell() < size:
+            row = next(self._records, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+        data = self._buffer.getvalue()
+        if size is not None and 0 <= size < len(data):
+            data, rest = data[:size], data[size:]
+        else:
+            rest = ''
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._buffer.write(rest)
+        return data
+
+
 # --- CLASSE DE ACESSO AO BANCO DE DADOS (COM ALTO DESEMPENHO) ---
 class PostgreSQLDataLoader:
     # ... (Esta classe já estava correta, pode ser mantida como na sua versão)
@@ -59,7 +92,7 @@ class PostgreSQLDataLoader:
         return self.connect()
 
         # SUBSTITUA SEU MÉTODO load_dataframe_fast POR ESTE CÓDIGO COMPLETO
-    def load_dataframe_fast(self, df: pd.DataFrame, table_name: str) -> (bool, str):
+    def load_dataframe_fast(self, records: Iterator[tuple], table_name: str, columns) -> (bool, str):
             if not self.conn or self.conn.closed:
                 logging.error("DIAGNÓSTICO FINAL: A conexão não existe ou está fechada ANTES de tentar o COPY.")
                 return False, "Sem conexão com o banco de dados."
@@ -75,7 +108,7 @@ class PostgreSQLDataLoader:
                 with self.conn.cursor() as cursor:
                     logging.info(f"ID do objeto de cursor: {id(cursor)}")
                     logging.info(f"Tentando carregar na tabela qualificada: '{table_name_qualified}'")
-                    logging.info(f"Nomes das colunas para o COPY: {list(df.columns)}")
+                    logging.info(f"Nomes das colunas para o COPY: {list(columns)}")
 
                     # O TESTE DEFINITIVO: O que este cursor específico vê AGORA?
                     # Usamos to_regclass, uma função do PostgreSQL que retorna NULL se a relação não for visível.
@@ -98,15 +131,15 @@ class PostgreSQLDataLoader:
             logging.info("--- FIM DO DIAGNÓSTICO FINAL ---")
             # --- FIM DO LOG ---
 
-            buffer = StringIO()
-            df.to_csv(buffer, sep='\t', header=False, index=False, na_rep='')
-            buffer.seek(0)
+            columns_str = ', '.join(f'"{c}"' for c in columns)
+            copy_sql = f"COPY {table_name_qualified} ({columns_str}) FROM STDIN WITH (FORMAT CSV)"
             try:
                 with self.conn.cursor() as cursor:
-                    # A chamada original que está falhando
-                    cursor.copy_from(buffer, table_name_qualified, sep='\t', null="", columns=df.columns)
+                    # Os registros são serializados em CSV à medida que o COPY consome o stream
+                    cursor.copy_expert(copy_sql, CsvRecordStream(records))
+                    total = cursor.rowcount
                 self.conn.commit()
-                return True, f"{len(df)} registros carregados com sucesso via COPY."
+                return True, f"{total} registros carregados com sucesso via COPY."
             except Exception as e:
                 if self.conn: self.conn.rollback()
                 # O log original do erro
@@ -641,8 +674,9 @@ class DataLoaderApp:
                         continue
                     table_df = df.copy()
                     table_df.columns = column_order
-                    table_df = self.convert_and_validate_data(table_df, table_name)
-                    if table_df is None:
+                    # convert_and_validate altera table_df diretamente e devolve um gerador de tuplas
+                    records = self.convert_and_validate(table_df, table_name)
+                    if records is None:
                         continue
                     self.ui_queue.put({'type': 'csv_progress', 'value': 75, 'text': "Carregando..."})
                     if self.dry_run_mode.get():
@@ -650,7 +684,7 @@ class DataLoaderApp:
                             {'type': 'log', 'message': f"SIMULAÇÃO: {len(table_df)} linhas seriam carregadas."})
                     else:
                         # USA O LOADER DA THREAD, E NÃO self.db_loader
-                        success, message = loader_thread.load_dataframe_fast(table_df, table_name)
+                        success, message = loader_thread.load_dataframe_fast(records, table_name, column_order)
                         log_func = self.ui_queue.put
                         log_func({'type': 'log' if success else 'error', 'message': message})
 
@@ -666,22 +700,24 @@ class DataLoaderApp:
                 if 'loader_thread' in locals():
                     loader_thread.close()
 
-    def convert_and_validate_data(self, df: pd.DataFrame, table_name: str) -> pd.DataFrame | None:
-        """Centraliza a limpeza, conversão e validação dos dados."""
+    def convert_and_validate(self, df: pd.DataFrame, table_name: str) -> Iterator[tuple] | None:
+        """
+        Centraliza a limpeza, conversão e validação dos dados. Modifica 'df' no próprio objeto.
+        Retorna um gerador de tuplas (NaN -> None) pronto para o COPY, ou None se a validação falhar.
+        """
         try:
-            df_copy = df.copy()
-            for col_name in df_copy.columns:
-                if pd.api.types.is_object_dtype(df_copy[col_name]):
-                    df_copy[col_name] = df_copy[col_name].str.strip()
-                    df_copy[col_name].replace(['', 'nan', 'NaN', 'None', 'NULL', 'null', 'NaT', '<NA>'], np.nan,
-                                              inplace=True)
+            for col_name in df.columns:
+                if pd.api.types.is_object_dtype(df[col_name]):
+                    df[col_name] = df[col_name].str.strip()
+                    df[col_name].replace(['', 'nan', 'NaN', 'None', 'NULL', 'null', 'NaT', '<NA>'], np.nan,
+                                         inplace=True)
 
             validation_schema = self.get_validation_schema(table_name)
             if validation_schema:
                 self.ui_queue.put({'type': 'log', 'message': "Validando dados..."})
                 self.ui_queue.put({'type': 'csv_progress', 'value': 50, 'text': "Validando..."})
                 try:
-                    validation_schema.validate(df_copy, lazy=True)
+                    validation_schema.validate(df, lazy=True)
                 except SchemaError as err:
                     report_path = f"erros_validacao_{table_name}_{datetime.now():%Y%m%d%H%M%S}.csv"
                     err.failure_cases.to_csv(report_path, index=False, sep=';', encoding='utf-8-sig')
@@ -689,11 +725,20 @@ class DataLoaderApp:
                                        'message': f"Dados inválidos para '{table_name}'. Detalhes em '{report_path}'."})
                     return None
 
-            return df_copy.astype(object).where(pd.notna(df_copy), None)
+            return self._iter_records(df)
         except Exception as e:
             self.ui_queue.put({'type': 'error', 'message': f"Erro na conversão/validação para '{table_name}': {e}"})
             return None
 
+    @staticmethod
+    def _iter_records(df: pd.DataFrame) -> Iterator[tuple]:
+        """
+        Gera as linhas do DataFrame como tuplas, com NaN/NA/NaT trocados por None coluna a coluna pelo pandas
+        (comparar v != v não serve para pd.NA, cuja comparação não é booleana).
+        """
+        colunas = [df.iloc[:, i].to_numpy(dtype=object, na_value=None) for i in range(df.shape[1])]
+        return zip(*colunas)
+
     def update_progress(self, value, text=""):
         """
         Atualiza a barra de progresso da aba de carga de CSV.
@@ -1,10 +1,24 @@
 import os
+import re
+import csv
+import codecs
+import sys
+import unicodedata
 import logging
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import psycopg2
+import psycopg2.pool
+from psycopg2.extras import execute_values
 import numpy as np
 import threading
 import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from collections.abc import Iterable
+from itertools import chain, islice
+from types import MappingProxyType
 from tkinter import Tk, filedialog, messagebox, ttk, Checkbutton, BooleanVar, StringVar, Canvas
 from tkinter.scrolledtext import ScrolledText
 from dotenv import load_dotenv
@@ -24,6 +38,102 @@ logging.basicConfig(
 load_dotenv()
 
 
+def _iter_rows(df: pd.DataFrame):
+    """
+    Percorre as linhas a partir dos arrays de cada coluna (sem converter o DataFrame inteiro para object).
+    NaN/NA/NaT viram None coluna a coluna, dentro do pandas, e não célula a célula em Python.
+    """
+    columns = [df.iloc[:, i].to_numpy(dtype=object, na_value=None) for i in range(df.shape[1])]
+    return zip(*columns)
+
+
+# Prefixo aplicado aos scripts SQL; o psycopg2 já abre a transação, então SET LOCAL vale até o commit
+_SESSAO_SCRIPT = (
+    "SET LOCAL synchronous_commit TO OFF; "
+    "SET LOCAL work_mem TO '256MB'; "
+    "SET LOCAL maintenance_work_mem TO '1GB';\n"
+)
+
+
+# Granularidade (em %) das atualizações de progresso enviadas à interface
+_PASSO_PROGRESSO = 5
+
+# Intervalo de leitura da ui_queue: curto enquanto chegam mensagens, dobrando até o máximo quando ociosa
+_POLL_MIN_MS = 20
+_POLL_MAX_MS = 250
+
+# Log da interface: intervalo de inserção em lote no widget e quantidade de linhas mantidas
+_LOG_FLUSH_MS = 50
+_LOG_MAX_LINHAS = 5000
+
+
+# Linhas serializadas por vez ao enviar um DataFrame único pelo COPY
+_LINHAS_POR_FATIA = 100_000
+
+
+def _dataframe_para_csv(df: pd.DataFrame) -> bytes:
+    """
+    Serializa o DataFrame em CSV (sem cabeçalho) com o escritor em C++ do PyArrow.
+    Colunas pd.ArrowDtype são escritas direto dos buffers Arrow; nulos saem como campo vazio sem aspas,
+    que o COPY CSV lê como NULL (textos sempre vão entre aspas).
+    """
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        for i, coluna in enumerate(table.columns):
+            if pa.types.is_dictionary(coluna.type):
+                # Colunas category: o escritor CSV recebe os textos, decodificados a partir do dicionário
+                decodificada = pa.chunked_array([c.dictionary_decode() for c in coluna.chunks],
+                                                coluna.type.value_type)
+                table = table.set_column(i, table.field(i).name, decodificada)
+        sink = pa.BufferOutputStream()
+        pacsv.write_csv(table, sink, write_options=pacsv.WriteOptions(include_header=False))
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Colunas object com tipos mistos, ou tipos que o escritor CSV do Arrow não suporta (ex.: durações,
+        # listas): usa o escritor do pandas, com a mesma convenção de nulos
+        return df.to_csv(index=False, header=False, na_rep='').encode('utf-8')
+    return sink.getvalue().to_pybytes()
+
+
+# --- LEITOR COM PROGRESSO PARA O COPY ---
+class _ChunkStreamReader:
+    """
+    Serializa em CSV, sob demanda, uma sequência de DataFrames consumida por um único COPY.
+    Com total_rows informado, avisa o percentual de linhas já enviadas entre um bloco e outro.
+    """
+
+    def __init__(self, chunks: Iterable[pd.DataFrame], progress_callback=None, total_rows=None):
+        self._chunks = iter(chunks)
+        self._callback = progress_callback if total_rows else None
+        self._total = total_rows
+        self._last_reported = 0
+        self._data = b''
+        self._pos = 0
+        self.rows = 0
+
+    def read(self, size=-1):
+        # Só converte o próximo bloco quando o anterior já foi totalmente enviado
+        while self._pos >= len(self._data):
+            if self._callback:
+                progress = min(100, int(self.rows / self._total * 100))
+                # Avisa a interface só a cada _PASSO_PROGRESSO% (no máximo ~20 atualizações por carga)
+                if progress - self._last_reported >= _PASSO_PROGRESSO:
+                    self._last_reported = progress
+                    self._callback(progress)
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return b''
+            self.rows += len(chunk)
+            self._data = _dataframe_para_csv(chunk)
+            self._pos = 0
+        end = len(self._data) if size is None or size < 0 else self._pos + size
+        data = self._data[self._pos:end]
+        self._pos += len(data)
+        return data
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+
 # --- CLASSE DE ACESSO AO BANCO DE DADOS ---
 class PostgreSQLDataLoader:
     """Classe para gerenciar a conexão e o carregamento de dados no PostgreSQL."""
@@ -41,96 +151,740 @@ class PostgreSQLDataLoader:
                 'host': os.getenv('DB_HOST', 'localhost'),
                 'port': os.getenv('DB_PORT', '5434')
             }
-        self.conn = None
+        # search_path enviado já na abertura da conexão, sem SET/commit extras
+        self.db_config['options'] = f'-c search_path={self.schema}'
+        self.pool = None
+        self._sql_cache = {}
+        self._funcoes_criadas = set()
+        # Opcional (DB_SQL_FUNCOES=1): scripts pré-definidos como funções PL/pgSQL, ver execute_as_function
+        self.usar_funcoes = os.getenv('DB_SQL_FUNCOES', '').strip().lower() in ('1', 'true', 'sim')
+        # Opcional (DB_SQL_PARALELO=1): scripts marcados como 'paralelo' rodam por tabela, ver _executar_por_tabela
+        self.sql_paralelo = os.getenv('DB_SQL_PARALELO', '').strip().lower() in ('1', 'true', 'sim')
         self.connect()
 
     def connect(self):
-        """Estabelece a conexão com o banco e define o search_path."""
+        """Cria o pool de conexões com o banco (as conexões mínimas já são abertas aqui)."""
         try:
-            if self.conn and not self.conn.closed:
-                self.conn.close()
-            self.conn = psycopg2.connect(**self.db_config)
-            with self.conn.cursor() as cursor:
-                cursor.execute(f"SET search_path TO {self.schema}")
-            self.conn.commit()
+            self.close()
+            self._funcoes_criadas.clear()
+            self.pool = psycopg2.pool.ThreadedConnectionPool(minconn=2, maxconn=8, **self.db_config)
             logging.info(f"Conexão com PostgreSQL estabelecida. Schema '{self.schema}' definido.")
             return True
         except psycopg2.OperationalError as e:
             logging.error(f"Erro ao conectar ao PostgreSQL: {e}")
-            self.conn = None
+            self.close()
+            self.pool = None
             return False
         except Exception as e:
             logging.error(f"Erro ao configurar a sessão do banco (verifique se o schema '{self.schema}' existe): {e}")
-            if self.conn:
-                self.conn.close()
-            self.conn = None
+            self.close()
+            self.pool = None
+            return False
+
+    @contextmanager
+    def _connection(self):
+        """Empresta uma conexão do pool e a devolve ao final."""
+        conn = self.pool.getconn()
+        try:
+            yield conn
+        finally:
+            self.pool.putconn(conn, close=bool(conn.closed))
+
+    def _build_query(self, kind: str, table_name: str, columns: tuple) -> str:
+        """Monta (uma única vez por tabela/colunas) o comando COPY ou INSERT usado na carga."""
+        key = (kind, self.schema, table_name, columns)
+        query = self._sql_cache.get(key)
+        if query is None:
+            columns_str = ', '.join([f'"{c}"' for c in columns])
+            if kind == 'copy':
+                query = f"COPY {self.schema}.{table_name} ({columns_str}) FROM STDIN WITH (FORMAT CSV)"
+            else:
+                query = f"INSERT INTO {self.schema}.{table_name} ({columns_str}) VALUES %s"
+            self._sql_cache[key] = query
+        return query
+
+    def has_config(self, config: dict) -> bool:
+        """Indica se a configuração informada (com 'schema') é a mesma usada pelo pool atual."""
+        config = dict(config)
+        schema = config.pop('schema', self.schema)
+        atual = {k: v for k, v in self.db_config.items() if k != 'options'}
+        return schema == self.schema and config == atual
+
+    def ping(self) -> bool:
+        """Verifica, com uma conexão já aberta do pool, se o banco responde."""
+        if not self.pool:
+            return False
+        try:
+            with self._connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
+            return True
+        except psycopg2.Error as e:
+            logging.error(f"Erro ao verificar a conexão com o PostgreSQL: {e}")
             return False
 
     def update_config(self, new_config):
         """Atualiza a configuração do banco e tenta reconectar."""
         self.schema = new_config.pop('schema', self.schema)
         self.db_config = new_config
+        self.db_config['options'] = f'-c search_path={self.schema}'
         return self.connect()
 
-    def load_dataframe(self, df: pd.DataFrame, table_name: str, progress_callback=None) -> bool:
-        """Carrega um DataFrame para uma tabela específica no banco de dados."""
+    def load_dataframe(self, data: pd.DataFrame | Iterable[pd.DataFrame], table_name: str, progress_callback=None,
+                       use_copy=True) -> int | None:
+        """
+        Carrega um DataFrame para uma tabela específica no banco de dados.
+        Aceita também um iterável de DataFrames (ex.: pd.read_csv(..., chunksize=50_000)), enviado bloco a bloco
+        no mesmo COPY, sem materializar o arquivo inteiro em memória.
+        Por padrão usa COPY FROM STDIN (um único fluxo); use_copy=False usa INSERT com múltiplos VALUES por lote.
+        Retorna o número de registros carregados, ou None se não houver conexão.
+        """
 
-        if not self.conn or self.conn.closed:
+        if not self.pool:
             logging.warning(f"Sem conexão. Não foi possível carregar dados na tabela {table_name}.")
             if progress_callback: progress_callback(100)
+            return None
+
+        if isinstance(data, pd.DataFrame):
+            first, chunks, total_rows = data, None, len(data)
+        else:
+            # Lê o primeiro bloco para conhecer as colunas antes de abrir o COPY
+            chunks = iter(data)
+            first, total_rows = next(chunks, None), None
+            if first is None:
+                logging.info(f"Nenhum registro para carregar na tabela {table_name}.")
+                if progress_callback: progress_callback(100)
+                return 0
+            chunks = chain([first], chunks)
+
+        with self._connection() as conn:
+            try:
+                column_order = tuple(first.columns)
+
+                if use_copy:
+                    query = self._build_query('copy', table_name, column_order)
+                    if chunks is None:
+                        # DataFrame único: serializado em fatias de _LINHAS_POR_FATIA linhas dentro do mesmo COPY,
+                        # sem montar o CSV inteiro em memória
+                        chunks = (first.iloc[inicio:inicio + _LINHAS_POR_FATIA]
+                                  for inicio in range(0, len(first), _LINHAS_POR_FATIA))
+                    reader = _ChunkStreamReader(chunks, progress_callback, total_rows)
+                    with conn.cursor() as cursor:
+                        cursor.copy_expert(query, reader)
+                    conn.commit()
+                    total_rows = reader.rows
+                    if progress_callback: progress_callback(100)
+                else:
+                    frames = [first] if chunks is None else chunks
+                    rows = chain.from_iterable(_iter_rows(frame) for frame in frames)
+                    # execute_values monta um único INSERT com múltiplos VALUES por lote
+                    query = self._build_query('insert', table_name, column_order)
+                    chunk_size = 1000
+                    processed = 0
+                    # Limiares pré-calculados: a cada 'step' linhas o progresso avança _PASSO_PROGRESSO%
+                    step = max(1, (total_rows or 0) // (100 // _PASSO_PROGRESSO))
+                    next_mark = step if progress_callback and total_rows else sys.maxsize
+                    pct = 0
+
+                    with conn.cursor() as cursor:
+                        while chunk := list(islice(rows, chunk_size)):
+                            execute_values(cursor, query, chunk, page_size=chunk_size)
+                            processed += len(chunk)
+                            if processed >= next_mark:
+                                while processed >= next_mark:
+                                    pct += _PASSO_PROGRESSO
+                                    next_mark += step
+                                progress_callback(min(pct, 100))
+                        conn.commit()
+                    total_rows = processed
+                    if progress_callback: progress_callback(100)
+
+                logging.info(f"{total_rows} registros carregados com sucesso na tabela {table_name}.")
+                return total_rows
+            except Exception as e:
+                conn.rollback()
+                logging.error(f"Erro ao carregar dados na tabela {table_name}: {e}")
+                raise e
+
+    def execute_custom_insert(self, sql) -> bool:
+        """
+        Executa um comando SQL personalizado.
+        Aceita também uma lista de comandos, enviados juntos em uma única ida ao servidor e uma única transação.
+        """
+        if not self.pool:
+            logging.warning("Sem conexão. Não foi possível executar o comando SQL.")
             return False
+        if not isinstance(sql, str):
+            sql = ';\n'.join(sql)
+        with self._connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    # Ajustes válidos apenas nesta transação: commit sem esperar o fsync do WAL e mais memória
+                    # para os hashes/ordenações dos UPDATEs com junção
+                    cursor.execute(_SESSAO_SCRIPT + sql)
+                    conn.commit()
+                return True
+            except Exception as e:
+                conn.rollback()
+                logging.error(f"Erro ao executar comando SQL: {e}")
+                raise e
+
+    def execute_batches(self, comandos: list[str], tamanho_lote=20, on_lote=None) -> bool:
+        """
+        Executa os comandos em lotes (uma ida ao servidor por lote), todos na mesma conexão e transação.
+        O commit acontece uma única vez ao final; qualquer erro desfaz o script inteiro.
+        on_lote(executados, total) é chamado após cada lote.
+        """
+        if not self.pool:
+            logging.warning("Sem conexão. Não foi possível executar o comando SQL.")
+            return False
+        total = len(comandos)
+        with self._connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(_SESSAO_SCRIPT)
+                    for inicio in range(0, total, tamanho_lote):
+                        lote = comandos[inicio:inicio + tamanho_lote]
+                        cursor.execute(';\n'.join(lote))
+                        if on_lote: on_lote(inicio + len(lote), total)
+                conn.commit()
+                return True
+            except Exception as e:
+                conn.rollback()
+                logging.error(f"Erro ao executar comando SQL: {e}")
+                raise e
+
+    def execute_script(self, nome: str, sql: str) -> bool:
+        """
+        Executa um script pré-definido: por padrão em uma ida ao servidor e uma transação
+        (execute_custom_insert); com usar_funcoes, como função PL/pgSQL (execute_as_function).
+        """
+        if self.usar_funcoes:
+            return self.execute_as_function(nome, sql)
+        return self.execute_custom_insert(sql)
 
-        try:
-            df_copy = df.copy()
+    def execute_as_function(self, nome: str, sql: str) -> bool:
+        """
+        Executa um script pré-definido como função PL/pgSQL ({schema}.etl_<nome>). Só é usado com
+        usar_funcoes ligado: cria objetos persistentes no schema (sem remoção automática) e exige permissão
+        CREATE nele. O plano de cada comando fica em cache só na sessão, então só há ganho quando o mesmo
+        script roda de novo na mesma conexão do pool; a primeira chamada planeja tudo normalmente.
+        """
+        slug = unicodedata.normalize('NFKD', nome).encode('ascii', 'ignore').decode().lower()
+        slug = re.sub(r'\W+', '_', slug).strip('_')
+        funcao = f"{self.schema}.etl_{slug}"
+        comandos = []
+        if (funcao, sql) not in self._funcoes_criadas:
+            corpo = sql.strip().rstrip(';')
+            comandos.append(
+                f"CREATE OR REPLACE FUNCTION {funcao}() RETURNS void LANGUAGE plpgsql AS $etl$\nBEGIN\n{corpo};\nEND\n$etl$")
+        comandos.append(f"SELECT {funcao}()")
+        resultado = self.execute_custom_insert(comandos)
+        self._funcoes_criadas.add((funcao, sql))
+        return resultado
 
-            df_copy = df_copy.astype(object).where(pd.notna(df_copy), None)
+    def close(self):
+        """Fecha todas as conexões do pool."""
+        if self.pool and not self.pool.closed:
+            self.pool.closeall()
+            logging.info("Conexão com PostgreSQL encerrada.")
+        # Sem pool, as próximas chamadas caem no aviso de "sem conexão" em vez de usar o pool fechado
+        self.pool = None
+
+
+# --- CONFIGURAÇÃO DAS TABELAS (constante, compartilhada por todas as instâncias) ---
+_TABLES_COLUMNS = {
+    'tab01': ['mesref', 'tipo_dia', 'fx_hora', 'viagens', 'tempo_percurso', 'disp_frota'],
+    'tab02_abril_maio': ['data_completa', 'hora_completa', 'entrada_id', 'cod_estacao', 'bloqueio_id', 'dbd_num','grupo_bilhete',
+              'forma_pagamento', 'tipo_bilhete', 'user_id', 'valor'],
+    'tab02_temp2': ['Data_Hora_Corrigida', 'Estacao', 'Bloqueio', 'Grupo_Bilhete', 'Forma_Pagamento',
+                    'Tipo_de_Bilhete'],
+    'tab02_marco': ['entrada_id', 'hora_completa', 'cod_estacao', 'bloqueio_id', 'dbd_num', 'grupo_bilhete',
+                   'forma_pagamento', 'tipo_bilhete', 'user_id', 'data_completa', 'valor'],
+    'tab03': ['ordem', 'dia', 'viagem', 'origemprevista', 'origemreal', 'destinoprevisto', 'destinoreal',
+              'horainicioprevista', 'horainicioreal', 'horafimprevista', 'horafimreal', 'trem', 'status',
+              'stat_desc', 'picovale',
+              'incidenteleve', 'incidentegrave', 'viagem_interrompida', 'id_ocorr', 'id_interrupcao',
+              'id_linha', 'lotacao'],
+    'tab04': ['id', 'tipo', 'subtipo', 'data', 'horaini', 'horafim', 'motivo', 'local', 'env_usuario',
+              'env_veiculo', 'bo'],
+    'tab05': ['nome_linha', 'status_linha', 'fim_operacao', 'cod_estacao', 'grupo_bilhete', 'ini_operacao',
+              'num_estacao', 'max_valor'],
+    'tab06': ['ordem', 'emissao', 'data', 'hora', 'tipo', 'trem', 'cdv', 'estacao', 'via', 'viagem', 'causa',
+              'excluir', 'motivo_da_exclusao'],
+    'tab07': ['linha', 'cod_estacao', 'estacao', 'bloqueio', 'c_empresa_validador', 'dbd_num', 'dbd_data',
+              'valid_ex_emp', 'valid_ex_num', 'valid_ex_data'],
+    'tab08': ['equipamento', 'descricao', 'modelo', 'serie', 'data_inicio_operacao', 'data_fim_operacao'],
+    'tab09_1': ['tue', 'data', 'hora_inicio', 'hora_fim', 'origem', 'destino', 'descricao', 'status','km'],
+    'tab09_2': ['composicao', 'data_abertura', 'data_fechamento', 'tipo_manutencao', 'tipo_desc', 'tipo_falha'],
+    'tab12': ['referencia', 'num_instalacao', 'tipo', 'total_kwh', 'local', 'endereco'],
+    'tab13': ['cdv', 'sent_normal_circ', 'comprimento', 'cod_velo_max', 'plat_est', 'temp_teor_perc',
+              'temp_med_perc', 'tempoocup'],
+    'arq01': ['mesref', 'tipo_dia', 'fx_hora', 'viagens', 'tempo_percurso', 'disp_frota'],
+    'arq02_bilhetagem': ['entrada_id', 'hora_completa', 'cod_estacao', 'bloqueio', 'dbd_num',
+                         'grupo_bilhetagem',
+                         'forma_pagamento', 'tipo_de_bilhete', 'user_id', 'data_completa', 'valor'],
+    'arq04_ocorrencias': ['id', 'tipo', 'subtipo', 'data', 'horaini', 'horafim', 'motivo', 'local',
+                          'env_usuario',
+                          'env_veiculo', 'bo'],
+    'arq05_1_reg_manutencao': ['data_abertura', 'composicao', 'data_fechamento', 'tipo_manutencao', 'tipo_desc',
+                               'tipo_falha'],
+    'arq05_8_nece_disp': ['ordem', 'data', 'hora', 'necessidade', 'disponibilidade'],
+    'arq07_linhas': ['num_estacao', 'nome_linha', 'ini_operacao', 'status_linha', 'fim_operacao', 'cod_estacao',
+                     'max_valor', 'grupo_bilhete'],
+    'arq07_paradas': ['num_estacao', 'estacao', 'cod_estacao', 'sistemas_que_operam'],
+    'arq08_03_11_15_viagens': ['ordem', 'dia', 'viagem', 'origem_previa', 'origem_real', 'destino_previo',
+                               'destino_real', 'hora_ini_prevista', 'hora_ini_real', 'hora_fim_prevista',
+                               'hora_fim_real', 'trem', 'status', 'desc_status', 'pico_vale', 'incidente_leve',
+                               'incidente_grave', 'viagem_interrompida', 'id_ocorrencia', 'id_interrupcao',
+                               'id_linha', 'lotacao'],
+    'arq12': ['ordem', '"emissao"', 'data', 'hora', 'tipo', 'trem', 'cdv', 'estacao', 'via', 'viagem', 'causa',
+              'excluir', 'motivo'],
+    'arq16_bloqueios': ['cod_estacao', 'estacao', 'bloqueio', 'dbd_id', 'data_pass', 'qtd_passageiros',
+                        'max_num_est', 'min_bloqueio'],
+    'tab_06_validadores': ['linha', 'cod_est', 'estacao', 'bloqueio', 'dbd_emp', 'dbd_num', 'dbd_data',
+                           'valid_ext_emp',
+                           'valida_ext_data'],
+    'tab_13_cdv': ['cdv', 'sentido_circulacao', 'comprimento', 'cod_vel_max', 'plataforma_estacao',
+                   'tempo_teorico_perc', 'tempo_medido_perc', 'tempo_ocupacao'],
+    'tab_consumo_energia': ['referencia', 'num_instalacao', 'tipo', 'total_kwh', 'local', 'endereco'],
+}
+# Tuplas imutáveis com nomes de coluna internados: a ordem não pode ser alterada por engano e a tupla
+# serve de chave no cache de SQL do carregador. A busca no dict usa hash e igualdade (não identidade);
+# internar só garante que nomes iguais sejam o mesmo objeto, o que encurta a comparação das tuplas
+TABLES_CONFIG = MappingProxyType(
+    {table: tuple(sys.intern(c) for c in columns) for table, columns in _TABLES_COLUMNS.items()}
+)
 
-            column_order = df_copy.columns.tolist()
+# Colunas de baixa cardinalidade (códigos de estação, categorias de bilhete, flags) lidas com codificação de
+# dicionário: cada bloco guarda um array de inteiros e só uma cópia de cada texto distinto
+_COLUNAS_DICIONARIO = MappingProxyType({
+    'tab01': ('tipo_dia', 'fx_hora'),
+    'tab02_abril_maio': ('cod_estacao', 'bloqueio_id', 'grupo_bilhete', 'forma_pagamento', 'tipo_bilhete', 'valor'),
+    'tab02_temp2': ('Estacao', 'Bloqueio', 'Grupo_Bilhete', 'Forma_Pagamento', 'Tipo_de_Bilhete'),
+    'tab02_marco': ('cod_estacao', 'bloqueio_id', 'grupo_bilhete', 'forma_pagamento', 'tipo_bilhete', 'valor'),
+    'tab03': ('origemprevista', 'origemreal', 'destinoprevisto', 'destinoreal', 'trem', 'status', 'stat_desc',
+              'picovale', 'incidenteleve', 'incidentegrave', 'viagem_interrompida', 'id_linha'),
+    'tab07': ('linha', 'cod_estacao', 'estacao', 'bloqueio', 'c_empresa_validador'),
+    'arq02_bilhetagem': ('cod_estacao', 'bloqueio', 'grupo_bilhetagem', 'forma_pagamento', 'tipo_de_bilhete',
+                         'valor'),
+    'arq08_03_11_15_viagens': ('origem_previa', 'origem_real', 'destino_previo', 'destino_real', 'trem', 'status',
+                               'desc_status', 'pico_vale', 'incidente_leve', 'incidente_grave',
+                               'viagem_interrompida', 'id_linha'),
+    'arq16_bloqueios': ('cod_estacao', 'estacao', 'bloqueio'),
+})
+
+# Comandos SQL pré-definidos; o estado do checkbox (BooleanVar) é criado por instância
+INSERTS_PREDEFINIDOS = (
+    {
+        'nome': "Padronização de Nomes",
+        # Os comandos de cada tabela de migracao são independentes entre si e podem rodar em paralelo, mas só
+        # com DB_SQL_PARALELO=1: por padrão o script roda numa única transação (ver _executar_por_tabela)
+        'paralelo': True,
+        'sql': """
+            set maintenance_work_mem = '1GB';
+            create index if not exists ix_validador_dbd_id on public.validador (dbd_id);
+            create index if not exists ix_frota_cod_trem on public.frota (cod_trem);
+            create index if not exists ix_frota_nome_trem on public.frota (nome_trem);
+            reset maintenance_work_mem;
+            analyze public.validador;
+            analyze public.frota;
+            analyze migracao.tab02_abril_maio;
+            analyze migracao.tab02_marco;
+            update migracao.tab01 set mesref = replace (mesref,'/','-'),
+                                      viagens = replace (viagens,'.0',''),
+                                      tipo_dia = case when tipo_dia = 'util' then 'Dia util' else tipo_dia end,
+                                      tempo_percurso = case when tempo_percurso = 'nan' then '00:00:00' else tempo_percurso end,
+                                      disp_frota = case when disp_frota = 'nan' then '0' else disp_frota end;
+            update migracao.tab02_abril_maio set dbd_num = id from public.validador i where dbd_num = i.dbd_id;
+            update migracao.tab02_marco set dbd_num = id from public.validador i where dbd_num = i.dbd_id;
+            update migracao.tab09_1 set tue = t.id from public.frota t where tue = t.cod_trem ;
+            update migracao.tab09_2 a set composicao = t.id from public.frota t where a.composicao = t.nome_trem;
+            update migracao.tab02_abril_maio a set cod_estacao = m.id
+                   from (values ('ELD', '1'), ('CID', '2'), ('VOS', '3'), ('GAM', '4'), ('CAL', '5'), ('CAP', '6'),
+                        ('LAG', '7'), ('CNT', '8'), ('SAE', '9'), ('SAT', '10'), ('HOT', '11'), ('SAI', '12'),
+                        ('JCS', '13'), ('MSH', '14'), ('SGB', '15'), ('PRM', '16'), ('WLB', '17'), ('FLO', '18'),
+                        ('VRO', '19')) as m(sigla, id)
+                  where a.cod_estacao = m.sigla;
+            update migracao.tab02_abril_maio set valor  = '5.50'  where valor = '5,5';
+            update migracao.tab02_marco a set cod_estacao = m.id
+                   from (values ('ELD', '1'), ('CID', '2'), ('VOS', '3'), ('GAM', '4'), ('CAL', '5'), ('CAP', '6'),
+                        ('LAG', '7'), ('CNT', '8'), ('SAE', '9'), ('SAT', '10'), ('HOT', '11'), ('SAI', '12'),
+                        ('JCS', '13'), ('MSH', '14'), ('SGB', '15'), ('PRM', '16'), ('WLB', '17'), ('FLO', '18'),
+                        ('VRO', '19')) as m(sigla, id)
+                  where a.cod_estacao = m.sigla;
+            update migracao.tab02_marco set valor  = '5.50'  where valor = '5,5';
+            update migracao.tab07 a set cod_estacao = m.id
+                   from (values ('ELD', '1'), ('CID', '2'), ('VOS', '3'), ('GAM', '4'), ('CAL', '5'), ('CAP', '6'),
+                        ('LAG', '7'), ('CNT', '8'), ('SAE', '9'), ('SAT', '10'), ('HOT', '11'), ('SAI', '12'),
+                        ('JCS', '13'), ('MSH', '14'), ('SGB', '15'), ('PRM', '16'), ('WLB', '17'), ('FLO', '18'),
+                        ('VRO', '19')) as m(sigla, id)
+                  where a.cod_estacao = m.sigla;
+            update migracao.tab03 set trem = i.id from public.frota i where trem = i.cod_trem;
+            delete from migracao.tab03 where status = '12';
+            update migracao.tab09_1 set tue = t.id from public.frota t where tue = t.cod_trem ;
+                """,
+    },
+    {
+        'nome': "Validadores ",
+        'sql': """INSERT INTO public.mov_dbd
+                                   (linha, cod_estacao, estacao, bloqueio, c_empresa_validador, dbd_num, dbd_data, valid_ex_emp, valid_ex_num, valid_ex_data)
+                                   select linha::int, cod_estacao::int, estacao, bloqueio::int, c_empresa_validador, dbd_num,TO_CHAR(TO_DATE(dbd_data , 'DD/MM/YYYY'), 'YYYY-MM-DD')::date, valid_ex_emp, valid_ex_num::int, TO_CHAR(TO_DATE(valid_ex_data , 'DD/MM/YYYY'), 'YYYY-MM-DD')::date 
+                                   from migracao.tab07 ;
+                                   insert into public.validador (dbd_id,bloqueio, validador, tipo )
+                                    select distinct dbd_num, bloqueio_id::INT ,'SEM_DADO','MOVIMENTACAO'  
+                                    from migracao.tab02_abril_maio tam where dbd_num not in (select md.dbd_id  from public.validador  md);
+
+                                    update migracao.tab02_abril_maio v set dbd_num = m.id  from public.validador m where v.dbd_num = m.dbd_id;
+                                    update migracao.tab02_marco  v set dbd_num = m.id  from public.validador m where v.dbd_num = m.dbd_id;
+                                   """,
+    },
+    {
+        'nome': "Quadro de Viagens",
+        'sql': """INSERT INTO public.ARQ1_PROGPLAN(MESREF, TIPO_DIA, FX_HORA, VIAGENS, TEMPO_PRECURSO, DISP_FROTA)
+                            SELECT (MESREF || '-01')::date, TIPO_DIA, FX_HORA::TIME, VIAGENS::INT, TEMPO_PERCURSO::TIME, DISP_FROTA::INT
+                           FROM migracao.tab01 AR;
+                           update public.arq1_progplan p set intervalo = m.intervalo::interval
+                           from (values (0,'01:00:00'),(2,'00:30:00'),(3,'00:20:00'),(4,'00:15:00'),(7,'00:09:00'),(8,'00:07:00'),(9,'00:06:30'),(10,'00:06:00'),
+                                        (11,'00:05:30'),(13,'00:04:40'),(14,'00:04:20'),(15,'00:04:00'),(16,'00:03:30'),(17,'00:03:30'),(18,'00:03:30'),(19,'00:03:00')) as m(viagens, intervalo)
+                           where p.viagens = m.viagens;
+                           """,
+    },
+    {
+        'nome': "Bilhetagem ",
+        'sql': """insert into public.arq2_bilhetagem (DATA_HORA,ID_ESTACAO,ID_BLOQUEIO,GRUPO_BILHETAGEM,FORMA_PGTO,TIPO_BILHETAGEM,id_validador,VALOR,USUARIO)
+                    select CONCAT(ab.data_completa, ' ', ab.hora_completa)::timestamp, ab.cod_estacao ::INT,ab.bloqueio_id::INT,ab.grupo_bilhete ,ab.forma_pagamento ,ab.tipo_bilhete,null,ab.valor ::numeric(3,2),ab.user_id 
+                    from migracao.tab02_abril_maio ab
+                    union all
+                    select CONCAT(ab.data_completa, ' ', ab.hora_completa)::timestamp,ab.cod_estacao ::INT,ab.bloqueio_id::INT,ab.grupo_bilhete ,ab.forma_pagamento ,ab.tipo_bilhete,null,ab.valor ::numeric(3,2),ab.user_id 
+                    from migracao.tab02_marco ab;                            
+            """,
+    },
+    {
+        'nome': "Viagens ",
+        'sql': """
+                    insert into public.arq3_viagens (ordem,"data",viagem,origem,destino,hora_ini,hora_fim,tipo_real,id_veiculo,incidente_leve,incidente_grave,viagem_interrompida,id_ocorrencia,id_interrupcao,id_linha,hora_ini_plan,hora_fim_plan )		
+	                        select ordem::int,dia::date,	viagem::int,	origemprevista ,	destinoprevisto ,	horainicioreal::time  ,	horafimreal::time ,	status::int,	trem::int,	case when incidenteleve = '' then false	when incidenteleve is null then false	when incidenteleve = 'nao' then false else true	end as inc_leve,	case when incidentegrave = '' then false when incidentegrave is null then false when incidentegrave = 'nao' then false	else true	end as inc_grave,	stat_desc ,	id_ocorr::int,	id_interrupcao::int,	id_linha::int,	t.horainicioprevista::time,	t.horafimprevista::time from migracao.tab03 t;
+                    update public.arq3_viagens set viagem_interrompida = 'Sem Interrupcao' where viagem_interrompida = 'Executada';
+                    update public.arq3_viagens set viagem_interrompida = 'Cancelada Totalmente' where viagem_interrompida = 'Cancelada';
+                    update public.arq3_viagens set viagem_interrompida = 'Cancelada Parcial' where viagem_interrompida = 'Interrompida';
+                    delete from public.arq3_viagens where viagem_interrompida in ('Injecao','Recolhimento');
+                    update public.arq3_viagens set tempo_prog = hora_fim_plan - hora_ini_plan;
+                    update public.arq3_viagens set tempo_real = hora_fim - hora_ini ;
+                    update public.arq3_viagens set mtrp = EXTRACT(EPOCH FROM  tempo_real ) / EXTRACT(EPOCH FROM  tempo_prog );
+                    update public.arq3_viagens set dia_semana = c.dia_semana from public.calendario c where "data" = c.data_calendario ;
+                    update public.arq3_viagens set dia_semana = 99 where "data" in (select  f.data_feriado from public.feriados f );
+                    update public.arq3_viagens v set intervalo = p.intervalo  from public.arq1_progplan p where v.dia_semana in (1,2,3,4,5) and extract(hour  from  p.fx_hora) = extract (hour from v.hora_ini) and extract(month from p.mesref) = extract(month from  v."data") and extract(year from v."data") = extract(year from p.mesref) and p.tipo_dia = 'Dias Uteis';
+                    update public.arq3_viagens v set intervalo = p.intervalo  from public.arq1_progplan p where v.dia_semana in (0,99) and extract(hour  from  p.fx_hora) = extract (hour from v.hora_ini) and extract(month from p.mesref) = extract(month from  v."data") and extract(year from v."data") = extract(year from p.mesref) and p.tipo_dia = 'Domingos e Feriados';
+                    update public.arq3_viagens v set intervalo = p.intervalo  from public.arq1_progplan p where v.dia_semana in (6) and extract(hour  from  p.fx_hora) = extract (hour from v.hora_ini) and extract(month from p.mesref) = extract(month from  v."data") and extract(year from v."data") = extract(year from p.mesref) and p.tipo_dia = 'Sabados';
+                    update public.arq3_viagens av set atraso = case
+                            when av.incidente_grave then 4.0
+                            when av.incidente_leve then 2.0
+                            when (av.tempo_prog - av.tempo_real) > av.intervalo * 3 then 1.0
+                            when (av.tempo_prog - av.tempo_real) > av.intervalo * 2 and (av.tempo_prog - av.tempo_real) <= av.intervalo * 3 then 0.5
+                            when av.tempo_prog > av.tempo_real then 0.0
+                            when (av.tempo_prog - av.tempo_real) < av.intervalo * 2 then 0.0
+                            when (av.tempo_prog - av.tempo_real) >= av.intervalo * 2 and (av.tempo_prog - av.tempo_real) <= av.intervalo * 3 then 0.5
+                            else av.atraso
+                        end;
+                    """,
+    },
+    {
+        'nome': "Interrupções de Viagem",
+        'sql': """INSERT INTO ARQ12_INTERRUPCOES (ID_VIAGEM, ID_OCORRENCIA, ID_VEICULO, TIPO_INCIDENTE, ORIGEM_FALHA, TEMPO_INTERRUPCAO, AMEACAS, DATA_HORA, ID_LOCAL, REFERENCIA, VIA, DESCRICAO, ABONO, JUSTIFICATIVA)
+                               SELECT a.viagem, 0, f.id, 'INTERRUPCAO', a.estacao , a.hora , false , TO_TIMESTAMP(a."data"  || ' ' || a.hora , 'YYYY-MM-DD HH24:MI:SS') , 0 , a.tipo::varchar(30), a.via, a.causa::varchar(30), a.excluir, a.motivo_exclusao::varchar(30)  from migracao.tab12 a inner join frota f on a.trem = f.cod_trem"""
+        ,
+    },
+
+    {
+        'nome': "Ocorrências",
+        'sql': """insert into public.arq4_ocorrencias (tipo,subtipo,"data",hora_ini,hora_fim,motivo,"local",bo,id_veiculo,id_dispositivo)
+                select tipo::varchar(20),subtipo::varchar(20),"data"::date,horaini::time,horafim::time,motivo,"local",bo,null,null from migracao.tab04 ;""",
+    },
+
+    {
+        'nome': "Manutenção",
+        'sql': """INSERT INTO public.registros_manutencao (tipo, data, subtipo, hora, local)
+                         SELECT tipo, data, subtipo, hora, local 
+                         FROM migracao.arq4_2_manutencao""",
+    },
+    {
+        'nome': "Energia",
+        'sql': """insert into public.energia (mes_ref, tipo,consumo ,"local" ,num_instalacao  )
+        select (referencia || '/01')::date, tipo , total_kwh::numeric,"local" , num_instalacao::numeric  from migracao.tab12;""",
+    },
+    {
+        'nome': "Deletar tabelas de migração",
+        'sql': """    
+                            delete from migracao.tab01;
+                            delete from migracao.tab02_temp2 ;
+                            delete from migracao.tab02_MARCO ;
+                            delete from migracao.tab02_abril_maio ;
+                            delete from migracao.tab03;
+                            delete from migracao.tab04;
+                            delete from migracao.tab05;
+                            delete from migracao.tab06;
+                            delete from migracao.tab07;
+                            delete from migracao.tab08;
+                            delete from migracao.tab09_1;
+                            delete from migracao.tab09_2;
+                            delete from migracao.tab12;
+                            delete from migracao.tab13;""",
+    }
+)
 
-            data = [tuple(x) for x in df_copy.to_numpy()]
-            columns_str = ', '.join([f'"{c}"' for c in column_order])
-            placeholders = ', '.join(['%s'] * len(column_order))
-            query = f"INSERT INTO {self.schema}.{table_name} ({columns_str}) VALUES ({placeholders})"
 
-            total_rows = len(data)
-            chunk_size = 1000
+# Textos tratados como nulos na leitura e na limpeza das colunas do CSV: os padrões do pd.read_csv
+# (na_values), que o leitor do PyArrow não aplica sozinho, mais o 'NaT'
+_VALORES_NULOS = ('', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                  '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null', 'NaT')
+# Mesmos valores como uma única expressão regular, testada com fullmatch em uma só passada por coluna
+_PADRAO_NULOS = '|'.join(re.escape(valor) for valor in _VALORES_NULOS)
 
-            with self.conn.cursor() as cursor:
-                for i in range(0, total_rows, chunk_size):
-                    chunk = data[i:i + chunk_size]
-                    cursor.executemany(query, chunk)
-                    if progress_callback:
-                        progress = min(100, int(((i + len(chunk)) / total_rows) * 100))
-                        progress_callback(progress)
-                self.conn.commit()
 
-            logging.info(f"{total_rows} registros carregados com sucesso na tabela {table_name}.")
-            return True
-        except Exception as e:
-            if self.conn: self.conn.rollback()
-            logging.error(f"Erro ao carregar dados na tabela {table_name}: {e}")
-            raise e
+def _pular_linha_invalida(row):
+    """Equivalente ao on_bad_lines='warn' do pandas: registra e descarta linhas com número de campos errado."""
+    logging.warning(f"Linha {row.number} ignorada: esperados {row.expected_columns} campos, "
+                    f"encontrados {row.actual_columns}.")
+    return 'skip'
 
-    def execute_custom_insert(self, sql: str) -> bool:
-        """Executa um comando SQL personalizado."""
-        if not self.conn or self.conn.closed:
-            logging.warning("Sem conexão. Não foi possível executar o comando SQL.")
-            return False
-        try:
-            with self.conn.cursor() as cursor:
-                cursor.execute(sql)
-                self.conn.commit()
-            return True
-        except Exception as e:
-            if self.conn: self.conn.rollback()
-            logging.error(f"Erro ao executar comando SQL: {e}")
-            raise e
 
-    def close(self):
-        """Fecha a conexão com o banco de dados."""
-        if self.conn and not self.conn.closed:
-            self.conn.close()
-            logging.info("Conexão com PostgreSQL encerrada.")
+# Bytes do início do arquivo usados para escolher a codificação
+_AMOSTRA_CODIFICACAO = 4 << 20
+
+
+def _detectar_codificacao(file_path: str, encodings) -> str | None:
+    """
+    Retorna a primeira codificação que decodifica sem erro os primeiros _AMOSTRA_CODIFICACAO bytes do arquivo
+    (uma única leitura, testada em memória para cada candidata). Um byte inválido depois da amostra aparece
+    como erro de decodificação do PyArrow na carga, e o COPY da tabela é desfeito.
+    """
+    with open(file_path, 'rb') as f:
+        amostra = f.read(_AMOSTRA_CODIFICACAO)
+    arquivo_inteiro = len(amostra) < _AMOSTRA_CODIFICACAO
+    for encoding in encodings:
+        try:
+            # final=False: um caractere multibyte cortado no fim da amostra não conta como erro
+            codecs.getincrementaldecoder(encoding)().decode(amostra, final=arquivo_inteiro)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+def _ler_cabecalho(file_path: str, delimiter: str, encoding: str) -> list[str]:
+    """Lê apenas a linha de cabeçalho do CSV."""
+    with open(file_path, encoding=encoding, newline='') as f:
+        return next(csv.reader(f, delimiter=delimiter), [])
+
+
+def _tipo_pandas(tipo: pa.DataType):
+    """Tipo pandas de cada coluna Arrow: dicionários viram category; o resto fica em pd.ArrowDtype."""
+    return None if pa.types.is_dictionary(tipo) else pd.ArrowDtype(tipo)
+
+
+def _ler_csv_em_blocos(file_path: str, delimiter: str, encoding: str, progress_callback=None,
+                       colunas_dicionario=()):
+    """
+    Lê o CSV incrementalmente com o leitor do PyArrow, gerando um DataFrame por bloco (memória constante).
+    Todas as colunas ficam como texto (como dtype=str), em memória Arrow (pd.ArrowDtype); as posições em
+    colunas_dicionario são lidas com codificação de dicionário e chegam como category.
+    O progresso é a posição de leitura no arquivo em relação ao seu tamanho.
+    """
+    header = _ler_cabecalho(file_path, delimiter, encoding)
+    dicionario = pa.dictionary(pa.int32(), pa.string())
+    column_types = {name: dicionario if i in colunas_dicionario else pa.string() for i, name in enumerate(header)}
+    tamanho = os.path.getsize(file_path)
+    ultimo = 0
+    with pa.memory_map(file_path) as source:  # o SO pagina o arquivo sob demanda durante o parse
+        reader = pacsv.open_csv(
+            source,
+            read_options=pacsv.ReadOptions(encoding=encoding, block_size=16 << 20),
+            parse_options=pacsv.ParseOptions(delimiter=delimiter, invalid_row_handler=_pular_linha_invalida),
+            convert_options=pacsv.ConvertOptions(column_types=column_types,
+                                                 strings_can_be_null=True, null_values=list(_VALORES_NULOS)),
+        )
+        for batch in reader:
+            yield batch.to_pandas(types_mapper=_tipo_pandas)
+            if progress_callback and tamanho:
+                progresso = min(100, int(source.tell() / tamanho * 100))
+                if progresso - ultimo >= _PASSO_PROGRESSO:
+                    ultimo = progresso
+                    progress_callback(progresso)
+
+
+def _limpar_categorias(serie: pd.Series) -> pd.Series:
+    """
+    Mesma limpeza das colunas de texto (strip + nulos), aplicada só aos valores distintos de uma coluna
+    category; os códigos são remapeados numa única operação vetorizada (O(distintos) em texto).
+    """
+    valores = pd.Series(serie.cat.categories).str.strip()
+    valores = valores.mask(valores.str.fullmatch(_PADRAO_NULOS, na=False))
+    # Textos que ficam iguais após o strip passam a compartilhar o mesmo código; nulos viram -1.
+    # O -1 extra no fim do mapa faz o código -1 (nulo de origem) continuar nulo na indexação.
+    mapa, categorias = pd.factorize(valores)
+    codigos = np.append(mapa, -1)[serie.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codigos, categories=categorias), index=serie.index, name=serie.name)
+
+
+# --- CONVERSÕES ESPECÍFICAS POR TABELA ---
+# Cada conversor recebe o DataFrame já limpo e retorna só as colunas convertidas.
+# Adicione aqui suas regras de negócio, usando os nomes das colunas, e registre em _CONVERSORES.
+
+def _convert_tab01(df: pd.DataFrame) -> dict:
+    """Regras para tab01."""
+    # Exemplo: Converte colunas para numérico, tratando erros.
+    # A coluna tempo_percurso pode ser convertida para pd.to_timedelta se necessário.
+    return {
+        'viagens': pd.to_numeric(df['viagens'], errors='coerce'),
+        'disp_frota': pd.to_numeric(df['disp_frota'], errors='coerce'),
+    }
+
+
+def _convert_tab02(df: pd.DataFrame) -> dict:
+    """Regras para tab02."""
+    # CORREÇÃO: Usa os nomes das colunas, e não os índices 0, 1, 10, etc.
+    novas = {'data_completa': pd.to_datetime(df['data_completa'], format='%d/%m/%Y', errors='coerce')}
+
+    # Converte 'valor' para numérico, tratando vírgula decimal
+    if 'valor' in df.columns:
+        novas['valor'] = pd.to_numeric(df['valor'].str.replace(',', '.', regex=False), errors='coerce')
+
+    # Converte colunas que devem ser inteiras
+    for col in ('entrada_id', 'cod_estacao', 'bloqueio_id', 'user_id'):
+        if col in df.columns:
+            novas[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')  # 'Int64' suporta nulos
+    return novas
+
+
+def _convert_tab03(df: pd.DataFrame) -> dict:
+    """Regras para tab03."""
+    novas = {'Dia': pd.to_datetime(df['Dia'], format='%d/%m/%Y', errors='coerce')}
+    # Exemplo para colunas de hora
+    for col in ('HoraInicioPrevista', 'HoraInicioReal', 'HoraFimPrevista', 'HoraFimReal'):
+        if col in df.columns:
+            novas[col] = pd.to_datetime(df[col], format='%H:%M:%S', errors='coerce').dt.time
+    return novas
+
+
+# Registro de conversores por tabela (mesmas chaves usadas até aqui).
+# ATENÇÃO: 'tab02' e 'tab103' não existem em TABLES_CONFIG (as tabelas reais são tab02_abril_maio, tab02_marco
+# e tab03), então _convert_tab02 e _convert_tab03 nunca rodam. Registrá-los nas tabelas reais muda os dados
+# carregados (datas/números inválidos viram nulo) e deve ser feito como mudança de comportamento à parte.
+_CONVERSORES = {
+    'tab01': _convert_tab01,
+    'tab02': _convert_tab02,
+    'tab103': _convert_tab03,
+}
+
+
+# Pontos do script SQL que o separador de comandos precisa examinar; o texto entre eles é pulado de uma vez
+_ESPECIAL_SQL = re.compile(r"""[;'"$]|--|/\*""")
+# Abertura de dólar-quote do PostgreSQL: $$ ou $tag$
+_DOLAR_QUOTE = re.compile(r'\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$')
+# Marcas de comentário de bloco (aninháveis no PostgreSQL)
+_COMENTARIO_BLOCO = re.compile(r'/\*|\*/')
+
+
+def _parte_de_identificador(sql: str, i: int) -> bool:
+    """True se o caractere na posição i continua um identificador (ex.: o E de nome_e'...' não é prefixo)."""
+    return i >= 0 and (sql[i].isalnum() or sql[i] in '_$')
+
+
+def _fim_citacao(sql: str, i: int, barra: bool = False) -> int:
+    """
+    Posição logo após o fechamento do literal ('...') ou identificador ("...") que abre em i; aspas dobradas
+    são escape e, com barra=True (strings E'...'), a barra invertida escapa o caractere seguinte.
+    """
+    aspas = sql[i]
+    j = i + 1
+    while True:
+        k = sql.find(aspas, j)
+        if barra:
+            barra_invertida = sql.find('\\', j)
+            if 0 <= barra_invertida < k or (k < 0 <= barra_invertida):
+                j = barra_invertida + 2
+                continue
+        if k < 0:
+            tipo = 'identificador' if aspas == '"' else 'literal de texto'
+            raise ValueError(f"Script SQL com {tipo} sem fechamento (posição {i}).")
+        if sql.startswith(aspas, k + 1):
+            j = k + 2
+            continue
+        return k + 1
+
+
+def _fim_comentario(sql: str, i: int) -> int:
+    """Posição logo após o fechamento do comentário /* ... */ que abre em i, respeitando aninhamento."""
+    nivel, j = 1, i + 2
+    while nivel:
+        marca = _COMENTARIO_BLOCO.search(sql, j)
+        if marca is None:
+            raise ValueError(f"Script SQL com comentário /* sem fechamento (posição {i}).")
+        nivel += 1 if marca.group() == '/*' else -1
+        j = marca.end()
+    return j
+
+
+def _separar_comandos(sql: str) -> list[str]:
+    """
+    Separa um script SQL em comandos nos ';' de nível superior. Os ';' dentro de literais ('...', com '' e,
+    em E'...', barra invertida), identificadores entre aspas duplas, comentários (-- e /* */) e corpos em
+    dólar-quote ($$...$$, $tag$...$tag$) não separam. Comandos só com comentários são descartados.
+    Levanta ValueError se um literal, identificador, comentário ou dólar-quote não é fechado.
+    """
+    comandos = []
+    inicio, tem_codigo, i = 0, False, 0
+    while (especial := _ESPECIAL_SQL.search(sql, i)) is not None:
+        j = especial.start()
+        tem_codigo = tem_codigo or bool(sql[i:j].strip())
+        marca = especial.group()
+        if marca == ';':
+            if tem_codigo:
+                comandos.append(sql[inicio:j].strip())
+            inicio, tem_codigo, i = j + 1, False, j + 1
+        elif marca == '--':
+            fim_linha = sql.find('\n', j)
+            i = len(sql) if fim_linha < 0 else fim_linha + 1
+        elif marca == '/*':
+            i = _fim_comentario(sql, j)
+        elif marca == '$':
+            dolar = None if _parte_de_identificador(sql, j - 1) else _DOLAR_QUOTE.match(sql, j)
+            if dolar:
+                fim = sql.find(dolar.group(), dolar.end())
+                if fim < 0:
+                    raise ValueError(f"Script SQL com dólar-quote {dolar.group()} sem fechamento (posição {j}).")
+                i = fim + len(dolar.group())
+            else:
+                i = j + 1
+            tem_codigo = True
+        else:
+            barra = marca == "'" and j > 0 and sql[j - 1] in 'Ee' and not _parte_de_identificador(sql, j - 2)
+            i = _fim_citacao(sql, j, barra)
+            tem_codigo = True
+    if tem_codigo or sql[i:].strip():
+        comandos.append(sql[inicio:].strip())
+    return comandos
+
+
+# Tabela de migracao alterada por um comando (UPDATE/DELETE); usada para agrupar scripts paralelizáveis
+_ALVO_MIGRACAO = re.compile(r'(?:update|delete\s+from)\s+migracao\.(\w+)', re.IGNORECASE)
+
+
+def _agrupar_por_tabela(sql: str):
+    """
+    Separa um script em comandos preparatórios (índices, analyze, SET...) e grupos de comandos por tabela
+    de migracao, mantendo a ordem original dentro de cada grupo.
+    """
+    preparacao, grupos = [], {}
+    for comando in _separar_comandos(sql):
+        alvo = _ALVO_MIGRACAO.match(comando)
+        if alvo:
+            grupos.setdefault(alvo.group(1).lower(), []).append(comando)
+        else:
+            preparacao.append(comando)
+    return preparacao, grupos
 
 
 # --- CLASSE PRINCIPAL DA APLICAÇÃO ---
@@ -150,277 +904,57 @@ class DataLoaderApp:
         self.db_loader = PostgreSQLDataLoader()
 
         self._setup_tables_config()
+        self._converters = dict(_CONVERSORES)
 
         self.selected_tables = {table: BooleanVar() for table in self.tables_config}
         self.executar_automatico = BooleanVar(value=False)
 
+        # Marcações espelhadas em conjuntos Python, atualizados pelos traces dos BooleanVar
+        self._selected_names = set()
+        self._inserts_marcados = set()
+        for table, var in self.selected_tables.items():
+            self._acompanhar_marcacao(var, self._selected_names, table)
+        for i, insert in enumerate(self.inserts_predefinidos):
+            self._acompanhar_marcacao(insert['var'], self._inserts_marcados, i)
+
+        self._poll_ms = _POLL_MIN_MS
+        self._poll_job = None
+        self._log_buf = []
+        self._log_flush_job = None
+
+        # Uma única thread de trabalho por toda a vida da aplicação, alimentada por (função, argumentos)
+        self._job_q = queue.Queue()
+        self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+        self._worker.start()
+
         self._create_ui()
         self.process_queue()
         self.testar_conexao(show_success_msg=False)
 
-    def _setup_tables_config(self):
-        """Define a configuração das tabelas e dos comandos SQL pré-definidos."""
-        self.tables_config = {
-            'tab01': ['mesref', 'tipo_dia', 'fx_hora', 'viagens', 'tempo_percurso', 'disp_frota'],
-            'tab02_abril_maio': ['data_completa', 'hora_completa', 'entrada_id', 'cod_estacao', 'bloqueio_id', 'dbd_num','grupo_bilhete',
-                      'forma_pagamento', 'tipo_bilhete', 'user_id', 'valor'],
-            'tab02_temp2': ['Data_Hora_Corrigida', 'Estacao', 'Bloqueio', 'Grupo_Bilhete', 'Forma_Pagamento',
-                            'Tipo_de_Bilhete'],
-            'tab02_marco': ['entrada_id', 'hora_completa', 'cod_estacao', 'bloqueio_id', 'dbd_num', 'grupo_bilhete',
-                           'forma_pagamento', 'tipo_bilhete', 'user_id', 'data_completa', 'valor'],
-            'tab03': ['ordem', 'dia', 'viagem', 'origemprevista', 'origemreal', 'destinoprevisto', 'destinoreal',
-                      'horainicioprevista', 'horainicioreal', 'horafimprevista', 'horafimreal', 'trem', 'status',
-                      'stat_desc', 'picovale',
-                      'incidenteleve', 'incidentegrave', 'viagem_interrompida', 'id_ocorr', 'id_interrupcao',
-                      'id_linha', 'lotacao'],
-            'tab04': ['id', 'tipo', 'subtipo', 'data', 'horaini', 'horafim', 'motivo', 'local', 'env_usuario',
-                      'env_veiculo', 'bo'],
-            'tab05': ['nome_linha', 'status_linha', 'fim_operacao', 'cod_estacao', 'grupo_bilhete', 'ini_operacao',
-                      'num_estacao', 'max_valor'],
-            'tab06': ['ordem', 'emissao', 'data', 'hora', 'tipo', 'trem', 'cdv', 'estacao', 'via', 'viagem', 'causa',
-                      'excluir', 'motivo_da_exclusao'],
-            'tab07': ['linha', 'cod_estacao', 'estacao', 'bloqueio', 'c_empresa_validador', 'dbd_num', 'dbd_data',
-                      'valid_ex_emp', 'valid_ex_num', 'valid_ex_data'],
-            'tab08': ['equipamento', 'descricao', 'modelo', 'serie', 'data_inicio_operacao', 'data_fim_operacao'],
-            'tab09_1': ['tue', 'data', 'hora_inicio', 'hora_fim', 'origem', 'destino', 'descricao', 'status','km'],
-            'tab09_2': ['composicao', 'data_abertura', 'data_fechamento', 'tipo_manutencao', 'tipo_desc', 'tipo_falha'],
-            'tab12': ['referencia', 'num_instalacao', 'tipo', 'total_kwh', 'local', 'endereco'],
-            'tab13': ['cdv', 'sent_normal_circ', 'comprimento', 'cod_velo_max', 'plat_est', 'temp_teor_perc',
-                      'temp_med_perc', 'tempoocup'],
-            'arq01': ['mesref', 'tipo_dia', 'fx_hora', 'viagens', 'tempo_percurso', 'disp_frota'],
-            'arq02_bilhetagem': ['entrada_id', 'hora_completa', 'cod_estacao', 'bloqueio', 'dbd_num',
-                                 'grupo_bilhetagem',
-                                 'forma_pagamento', 'tipo_de_bilhete', 'user_id', 'data_completa', 'valor'],
-            'arq04_ocorrencias': ['id', 'tipo', 'subtipo', 'data', 'horaini', 'horafim', 'motivo', 'local',
-                                  'env_usuario',
-                                  'env_veiculo', 'bo'],
-            'arq05_1_reg_manutencao': ['data_abertura', 'composicao', 'data_fechamento', 'tipo_manutencao', 'tipo_desc',
-                                       'tipo_falha'],
-            'arq05_8_nece_disp': ['ordem', 'data', 'hora', 'necessidade', 'disponibilidade'],
-            'arq07_linhas': ['num_estacao', 'nome_linha', 'ini_operacao', 'status_linha', 'fim_operacao', 'cod_estacao',
-                             'max_valor', 'grupo_bilhete'],
-            'arq07_paradas': ['num_estacao', 'estacao', 'cod_estacao', 'sistemas_que_operam'],
-            'arq08_03_11_15_viagens': ['ordem', 'dia', 'viagem', 'origem_previa', 'origem_real', 'destino_previo',
-                                       'destino_real', 'hora_ini_prevista', 'hora_ini_real', 'hora_fim_prevista',
-                                       'hora_fim_real', 'trem', 'status', 'desc_status', 'pico_vale', 'incidente_leve',
-                                       'incidente_grave', 'viagem_interrompida', 'id_ocorrencia', 'id_interrupcao',
-                                       'id_linha', 'lotacao'],
-            'arq12': ['ordem', '"emissao"', 'data', 'hora', 'tipo', 'trem', 'cdv', 'estacao', 'via', 'viagem', 'causa',
-                      'excluir', 'motivo'],
-            'arq16_bloqueios': ['cod_estacao', 'estacao', 'bloqueio', 'dbd_id', 'data_pass', 'qtd_passageiros',
-                                'max_num_est', 'min_bloqueio'],
-            'tab_06_validadores': ['linha', 'cod_est', 'estacao', 'bloqueio', 'dbd_emp', 'dbd_num', 'dbd_data',
-                                   'valid_ext_emp',
-                                   'valida_ext_data'],
-            'tab_13_cdv': ['cdv', 'sentido_circulacao', 'comprimento', 'cod_vel_max', 'plataforma_estacao',
-                           'tempo_teorico_perc', 'tempo_medido_perc', 'tempo_ocupacao'],
-            'tab_consumo_energia': ['referencia', 'num_instalacao', 'tipo', 'total_kwh', 'local', 'endereco'],
-        }
+    def _worker_loop(self):
+        """Executa, em ordem, as tarefas enfileiradas pela interface (carga de CSV e execução de SQL)."""
+        while True:
+            fn, args = self._job_q.get()
+            try:
+                fn(*args)
+            except Exception as e:
+                # As tarefas tratam os próprios erros; isto só impede que a thread de trabalho morra
+                logging.error(f"Erro inesperado na thread de trabalho: {e}")
 
-        self.inserts_predefinidos = [
-            {
-                'nome': "Padronização de Nomes",
-                'sql': """
-                    update migracao.tab01 set mesref = replace (mesref,'/','-');
-                    update migracao.tab01 set viagens  = replace (viagens,'.0','');
-                    update migracao.tab02_abril_maio set dbd_num = id from public.validador i where dbd_num = i.dbd_id;
-                    update migracao.tab02_marco set dbd_num = id from public.validador i where dbd_num = i.dbd_id;
-                    update migracao.tab01 set tipo_dia = 'Dia util' where tipo_dia ='util';
-                    update migracao.tab01 set tempo_percurso  = '00:00:00' where tempo_percurso ='nan';
-                    update migracao.tab01 set disp_frota  = '0' where disp_frota  ='nan';
-                    update migracao.tab09_1 set tue = t.id from public.frota t where tue = t.cod_trem ;
-                    update migracao.tab09_2 a set composicao = t.id from public.frota t where a.composicao = t.nome_trem;   
-                    update migracao.tab02_abril_maio set cod_estacao = 1 where cod_estacao ='ELD';
-                    update migracao.tab02_abril_maio set cod_estacao = 2 where cod_estacao = 'CID';	
-                    update migracao.tab02_abril_maio set cod_estacao = 3 where cod_estacao = 'VOS';
-                    update migracao.tab02_abril_maio set cod_estacao = 4 where cod_estacao = 'GAM';
-                    update migracao.tab02_abril_maio set cod_estacao = 5 where cod_estacao = 'CAL';
-                    update migracao.tab02_abril_maio set cod_estacao = 6 where cod_estacao = 'CAP';
-                    update migracao.tab02_abril_maio set cod_estacao = 7 where cod_estacao ='LAG';
-                    update migracao.tab02_abril_maio set cod_estacao = 8 where cod_estacao = 'CNT';
-                    update migracao.tab02_abril_maio set cod_estacao = 9 where cod_estacao = 'SAE';
-                    update migracao.tab02_abril_maio set cod_estacao = 10 where cod_estacao = 'SAT';
-                    update migracao.tab02_abril_maio set cod_estacao = 11 where cod_estacao = 'HOT';
-                    update migracao.tab02_abril_maio set cod_estacao = 12 where cod_estacao = 'SAI';
-                    update migracao.tab02_abril_maio set cod_estacao = 13 where cod_estacao = 'JCS';
-                    update migracao.tab02_abril_maio set cod_estacao = 14 where cod_estacao = 'MSH';
-                    update migracao.tab02_abril_maio set cod_estacao = 15 where cod_estacao = 'SGB';
-                    update migracao.tab02_abril_maio set cod_estacao = 16 where cod_estacao = 'PRM';
-                    update migracao.tab02_abril_maio set cod_estacao = 17 where cod_estacao = 'WLB';
-                    update migracao.tab02_abril_maio set cod_estacao = 18 where cod_estacao = 'FLO';
-                    update migracao.tab02_abril_maio set cod_estacao = 19 where cod_estacao = 'VRO';
-                    update migracao.tab02_abril_maio set valor  = '5.50'  where valor = '5,5';
-                    update migracao.tab02_marco set cod_estacao = 1 where cod_estacao ='ELD';
-                    update migracao.tab02_marco set cod_estacao = 2 where cod_estacao = 'CID';	
-                    update migracao.tab02_marco set cod_estacao = 3 where cod_estacao = 'VOS';
-                    update migracao.tab02_marco set cod_estacao = 4 where cod_estacao = 'GAM';
-                    update migracao.tab02_marco set cod_estacao = 5 where cod_estacao = 'CAL';
-                    update migracao.tab02_marco set cod_estacao = 6 where cod_estacao = 'CAP';
-                    update migracao.tab02_marco set cod_estacao = 7 where cod_estacao ='LAG';
-                    update migracao.tab02_marco set cod_estacao = 8 where cod_estacao =	'CNT';
-                    update migracao.tab02_marco set cod_estacao = 9 where cod_estacao = 'SAE';
-                    update migracao.tab02_marco set cod_estacao = 10 where cod_estacao = 'SAT';
-                    update migracao.tab02_marco set cod_estacao = 11 where cod_estacao = 'HOT';
-                    update migracao.tab02_marco set cod_estacao = 12 where cod_estacao = 'SAI';
-                    update migracao.tab02_marco set cod_estacao = 13 where cod_estacao = 'JCS';
-                    update migracao.tab02_marco set cod_estacao = 14 where cod_estacao = 'MSH';
-                    update migracao.tab02_marco set cod_estacao = 15 where cod_estacao = 'SGB';
-                    update migracao.tab02_marco set cod_estacao = 16 where cod_estacao = 'PRM';
-                    update migracao.tab02_marco set cod_estacao = 17 where cod_estacao = 'WLB';
-                    update migracao.tab02_marco set cod_estacao = 18 where cod_estacao = 'FLO';
-                    update migracao.tab02_marco set cod_estacao = 19 where cod_estacao = 'VRO';
-                    update migracao.tab02_marco set valor  = '5.50'  where valor = '5,5';
-                    update migracao.tab07  set cod_estacao = 1 where cod_estacao ='ELD';
-                    update migracao.tab07 set cod_estacao = 2 where cod_estacao = 'CID';	
-                    update migracao.tab07 set cod_estacao = 3 where cod_estacao = 'VOS';
-                    update migracao.tab07 set cod_estacao = 4 where cod_estacao = 'GAM';
-                    update migracao.tab07 set cod_estacao = 5 where cod_estacao = 'CAL';
-                    update migracao.tab07 set cod_estacao = 6 where cod_estacao = 'CAP';
-                    update migracao.tab07 set cod_estacao = 7 where cod_estacao = 'LAG';
-                    update migracao.tab07 set cod_estacao = 8 where cod_estacao = 'CNT';
-                    update migracao.tab07 set cod_estacao = 9 where cod_estacao = 'SAE';
-                    update migracao.tab07 set cod_estacao = 10 where cod_estacao = 'SAT';
-                    update migracao.tab07 set cod_estacao = 11 where cod_estacao = 'HOT';
-                    update migracao.tab07 set cod_estacao = 12 where cod_estacao = 'SAI';
-                    update migracao.tab07 set cod_estacao = 13 where cod_estacao = 'JCS';
-                    update migracao.tab07 set cod_estacao = 14 where cod_estacao = 'MSH';
-                    update migracao.tab07 set cod_estacao = 15 where cod_estacao = 'SGB';
-                    update migracao.tab07 set cod_estacao = 16 where cod_estacao = 'PRM';
-                    update migracao.tab07 set cod_estacao = 17 where cod_estacao = 'WLB';
-                    update migracao.tab07 set cod_estacao = 18 where cod_estacao = 'FLO';
-                    update migracao.tab07 set cod_estacao = 19 where cod_estacao = 'VRO';
-                    update migracao.tab03 set trem = i.id from public.frota i where trem = i.cod_trem;
-                    delete from migracao.tab03 where status = '12';
-                    update migracao.tab09_1 set tue = t.id from public.frota t where tue = t.cod_trem ;
-                        """,
-                'var': BooleanVar(value=False)
-            },
-            {
-                'nome': "Validadores ",
-                'sql': """INSERT INTO public.mov_dbd
-                                           (linha, cod_estacao, estacao, bloqueio, c_empresa_validador, dbd_num, dbd_data, valid_ex_emp, valid_ex_num, valid_ex_data)
-                                           select linha::int, cod_estacao::int, estacao, bloqueio::int, c_empresa_validador, dbd_num,TO_CHAR(TO_DATE(dbd_data , 'DD/MM/YYYY'), 'YYYY-MM-DD')::date, valid_ex_emp, valid_ex_num::int, TO_CHAR(TO_DATE(valid_ex_data , 'DD/MM/YYYY'), 'YYYY-MM-DD')::date 
-                                           from migracao.tab07 ;
-                                           insert into public.validador (dbd_id,bloqueio, validador, tipo )
-                                            select distinct dbd_num, bloqueio_id::INT ,'SEM_DADO','MOVIMENTACAO'  
-                                            from migracao.tab02_abril_maio tam where dbd_num not in (select md.dbd_id  from public.validador  md);
-
-                                            update migracao.tab02_abril_maio v set dbd_num = m.id  from public.validador m where v.dbd_num = m.dbd_id;
-                                            update migracao.tab02_marco  v set dbd_num = m.id  from public.validador m where v.dbd_num = m.dbd_id;
-                                           """,
-                'var': BooleanVar(value=False)
-            },
-            {
-                'nome': "Quadro de Viagens",
-                'sql': """INSERT INTO public.ARQ1_PROGPLAN(MESREF, TIPO_DIA, FX_HORA, VIAGENS, TEMPO_PRECURSO, DISP_FROTA)
-                                    SELECT (MESREF || '-01')::date, TIPO_DIA, FX_HORA::TIME, VIAGENS::INT, TEMPO_PERCURSO::TIME, DISP_FROTA::INT
-                                   FROM migracao.tab01 AR;
-                                   update public.arq1_progplan set intervalo = '00:07:00' where viagens  = 8 ;
-                                   update public.arq1_progplan set intervalo = '00:03:30' where viagens  = 16;
-                                   update public.arq1_progplan set intervalo = '00:03:30' where viagens  = 18;
-                                   update public.arq1_progplan set intervalo = '00:03:30' where viagens  = 17;
-                                   update public.arq1_progplan set intervalo = '00:04:00' where viagens  = 15;
-                                   update public.arq1_progplan set intervalo = '00:09:00' where viagens  = 7;
-                                   update public.arq1_progplan set intervalo = '00:30:00' where viagens  = 2;
-                                   update public.arq1_progplan set intervalo = '00:15:00' where viagens  = 4;
-                                   update public.arq1_progplan set intervalo = '00:06:00' where viagens  = 10;
-                                   update public.arq1_progplan set intervalo = '00:03:00' where viagens  = 19;
-                                   update public.arq1_progplan set intervalo = '00:06:30' where viagens  = 9;
-                                   update public.arq1_progplan set intervalo = '00:04:20' where viagens  = 14;
-                                   update public.arq1_progplan set intervalo = '00:04:40' where viagens  = 13;
-                                   update public.arq1_progplan set intervalo = '01:00:00' where viagens  = 0;
-                                   update public.arq1_progplan set intervalo = '00:20:00' where viagens  = 3;
-                                   update public.arq1_progplan set intervalo = '00:05:30' where viagens  = 11;
-                                   """,
-                'var': BooleanVar(value=False)
-            },
-            {
-                'nome': "Bilhetagem ",
-                'sql': """insert into public.arq2_bilhetagem (DATA_HORA,ID_ESTACAO,ID_BLOQUEIO,GRUPO_BILHETAGEM,FORMA_PGTO,TIPO_BILHETAGEM,id_validador,VALOR,USUARIO)
-                            select CONCAT(ab.data_completa, ' ', ab.hora_completa)::timestamp, ab.cod_estacao ::INT,ab.bloqueio_id::INT,ab.grupo_bilhete ,ab.forma_pagamento ,ab.tipo_bilhete,null,ab.valor ::numeric(3,2),ab.user_id 
-                            from migracao.tab02_abril_maio ab ;
-                            insert into public.arq2_bilhetagem (DATA_HORA,ID_ESTACAO,ID_BLOQUEIO,GRUPO_BILHETAGEM,FORMA_PGTO,TIPO_BILHETAGEM,id_validador,VALOR,USUARIO)
-                            select CONCAT(ab.data_completa, ' ', ab.hora_completa)::timestamp,ab.cod_estacao ::INT,ab.bloqueio_id::INT,ab.grupo_bilhete ,ab.forma_pagamento ,ab.tipo_bilhete,null,ab.valor ::numeric(3,2),ab.user_id 
-                            from migracao.tab02_marco ab;                            
-                    """,
-                'var': BooleanVar(value=False)
-            },
-            {
-                'nome': "Viagens ",
-                'sql': """
-                            insert into public.arq3_viagens (ordem,"data",viagem,origem,destino,hora_ini,hora_fim,tipo_real,id_veiculo,incidente_leve,incidente_grave,viagem_interrompida,id_ocorrencia,id_interrupcao,id_linha,hora_ini_plan,hora_fim_plan )		
-	                        select ordem::int,dia::date,	viagem::int,	origemprevista ,	destinoprevisto ,	horainicioreal::time  ,	horafimreal::time ,	status::int,	trem::int,	case when incidenteleve = '' then false	when incidenteleve is null then false	when incidenteleve = 'nao' then false else true	end as inc_leve,	case when incidentegrave = '' then false when incidentegrave is null then false when incidentegrave = 'nao' then false	else true	end as inc_grave,	stat_desc ,	id_ocorr::int,	id_interrupcao::int,	id_linha::int,	t.horainicioprevista::time,	t.horafimprevista::time from migracao.tab03 t;
-                            update public.arq3_viagens set viagem_interrompida = 'Sem Interrupcao' where viagem_interrompida = 'Executada';
-                            update public.arq3_viagens set viagem_interrompida = 'Cancelada Totalmente' where viagem_interrompida = 'Cancelada';
-                            update public.arq3_viagens set viagem_interrompida = 'Cancelada Parcial' where viagem_interrompida = 'Interrompida';
-                            delete from public.arq3_viagens where viagem_interrompida in ('Injecao','Recolhimento');
-                            update public.arq3_viagens set tempo_prog = hora_fim_plan - hora_ini_plan;
-                            update public.arq3_viagens set tempo_real = hora_fim - hora_ini ;
-                            update public.arq3_viagens set mtrp = EXTRACT(EPOCH FROM  tempo_real ) / EXTRACT(EPOCH FROM  tempo_prog );
-                            update public.arq3_viagens set dia_semana = c.dia_semana from public.calendario c where "data" = c.data_calendario ;
-                            update public.arq3_viagens set dia_semana = 99 where "data" in (select  f.data_feriado from public.feriados f );
-                            update public.arq3_viagens v set intervalo = p.intervalo  from public.arq1_progplan p where v.dia_semana in (1,2,3,4,5) and extract(hour  from  p.fx_hora) = extract (hour from v.hora_ini) and extract(month from p.mesref) = extract(month from  v."data") and extract(year from v."data") = extract(year from p.mesref) and p.tipo_dia = 'Dias Uteis';
-                            update public.arq3_viagens v set intervalo = p.intervalo  from public.arq1_progplan p where v.dia_semana in (0,99) and extract(hour  from  p.fx_hora) = extract (hour from v.hora_ini) and extract(month from p.mesref) = extract(month from  v."data") and extract(year from v."data") = extract(year from p.mesref) and p.tipo_dia = 'Domingos e Feriados';
-                            update public.arq3_viagens v set intervalo = p.intervalo  from public.arq1_progplan p where v.dia_semana in (6) and extract(hour  from  p.fx_hora) = extract (hour from v.hora_ini) and extract(month from p.mesref) = extract(month from  v."data") and extract(year from v."data") = extract(year from p.mesref) and p.tipo_dia = 'Sabados';
-                            update  public.arq3_viagens av set atraso = 0.5 where (av.tempo_prog - av.tempo_real) >= intervalo * 2 and (av.tempo_prog - av.tempo_real) <= intervalo * 3;
-                            update  public.arq3_viagens av set atraso = 0.0 where (av.tempo_prog - av.tempo_real) < intervalo * 2 ;
-                            update  public.arq3_viagens av set atraso = 0.0 where av.tempo_prog > av.tempo_real;
-                            update  public.arq3_viagens av set atraso = 0.5 where (av.tempo_prog - av.tempo_real) > intervalo * 2 and (av.tempo_prog - av.tempo_real) <= intervalo * 3;
-                            update  public.arq3_viagens av set atraso = 1.0 where (av.tempo_prog - av.tempo_real) > intervalo * 3;
-                            update  public.arq3_viagens av set atraso = 1.0 where (av.tempo_prog - av.tempo_real) > intervalo * 3;
-                            update public.arq3_viagens  set atraso = 2.0 where incidente_leve is true ;
-                            update public.arq3_viagens set atraso = 4.0 where incidente_grave is true ;
-                            """,
-                'var': BooleanVar(value=False)
-            },
-            {
-                'nome': "Interrupções de Viagem",
-                'sql': """INSERT INTO ARQ12_INTERRUPCOES (ID_VIAGEM, ID_OCORRENCIA, ID_VEICULO, TIPO_INCIDENTE, ORIGEM_FALHA, TEMPO_INTERRUPCAO, AMEACAS, DATA_HORA, ID_LOCAL, REFERENCIA, VIA, DESCRICAO, ABONO, JUSTIFICATIVA)
-                                       SELECT a.viagem, 0, f.id, 'INTERRUPCAO', a.estacao , a.hora , false , TO_TIMESTAMP(a."data"  || ' ' || a.hora , 'YYYY-MM-DD HH24:MI:SS') , 0 , a.tipo::varchar(30), a.via, a.causa::varchar(30), a.excluir, a.motivo_exclusao::varchar(30)  from migracao.tab12 a inner join frota f on a.trem = f.cod_trem"""
-                ,
-                'var': BooleanVar(value=False)
-            },
-
-            {
-                'nome': "Ocorrências",
-                'sql': """insert into public.arq4_ocorrencias (tipo,subtipo,"data",hora_ini,hora_fim,motivo,"local",bo,id_veiculo,id_dispositivo)
-                        select tipo::varchar(20),subtipo::varchar(20),"data"::date,horaini::time,horafim::time,motivo,"local",bo,null,null from migracao.tab04 ;""",
-                'var': BooleanVar(value=False)
-            },
-
-            {
-                'nome': "Manutenção",
-                'sql': """INSERT INTO public.registros_manutencao (tipo, data, subtipo, hora, local)
-                                 SELECT tipo, data, subtipo, hora, local 
-                                 FROM migracao.arq4_2_manutencao""",
-                'var': BooleanVar(value=False)
-            },
-            {
-                'nome': "Energia",
-                'sql': """insert into public.energia (mes_ref, tipo,consumo ,"local" ,num_instalacao  )
-                select (referencia || '/01')::date, tipo , total_kwh::numeric,"local" , num_instalacao::numeric  from migracao.tab12;""",
-                'var': BooleanVar(value=False)
-            },
-            {
-                'nome': "Deletar tabelas de migração",
-                'sql': """    
-                                    delete from migracao.tab01;
-                                    delete from migracao.tab02_temp2 ;
-                                    delete from migracao.tab02_MARCO ;
-                                    delete from migracao.tab02_abril_maio ;
-                                    delete from migracao.tab03;
-                                    delete from migracao.tab04;
-                                    delete from migracao.tab05;
-                                    delete from migracao.tab06;
-                                    delete from migracao.tab07;
-                                    delete from migracao.tab08;
-                                    delete from migracao.tab09_1;
-                                    delete from migracao.tab09_2;
-                                    delete from migracao.tab12;
-                                    delete from migracao.tab13;""",
-                'var': BooleanVar(value=False)
-            }
-        ]
+    def _setup_tables_config(self):
+        """Vincula a configuração das tabelas e cria o estado dos comandos SQL pré-definidos."""
+        self.tables_config = TABLES_CONFIG
+        self.inserts_predefinidos = [{**insert, 'var': BooleanVar(value=False)} for insert in INSERTS_PREDEFINIDOS]
+
+    @staticmethod
+    def _acompanhar_marcacao(var, conjunto, chave):
+        """Mantém 'conjunto' em sincronia com o BooleanVar, para ler as marcações sem consultar o Tcl."""
+        def atualizar(*_):
+            if var.get():
+                conjunto.add(chave)
+            else:
+                conjunto.discard(chave)
+        var.trace_add('write', atualizar)
 
     def _create_ui(self):
         """Cria a interface do usuário com abas."""
@@ -609,12 +1143,17 @@ class DataLoaderApp:
 
     def testar_conexao(self, show_success_msg=True):
         config = self._get_config_from_vars()
-        temp_loader = PostgreSQLDataLoader(config)
-        if temp_loader.conn:
+        if self.db_loader.has_config(config):
+            # Mesma configuração do carregador: testa com o pool já aberto, sem novo handshake
+            conectado = self.db_loader.ping()
+        else:
+            temp_loader = PostgreSQLDataLoader(config)
+            conectado = temp_loader.pool is not None
+            temp_loader.close()
+        if conectado:
             self.db_status_label.config(text="Status: Conexão bem-sucedida!", foreground='green')
             if show_success_msg: messagebox.showinfo("Sucesso",
                                                      "Conexão com o banco de dados estabelecida com sucesso!")
-            temp_loader.close()
             return True
         else:
             self.db_status_label.config(text="Status: Falha na conexão.", foreground='red')
@@ -640,10 +1179,12 @@ class DataLoaderApp:
     def detect_delimiter(self, file_path):
         """Tenta detectar o delimitador do arquivo CSV"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            # Lê a primeira linha em bytes (sem decodificar) e conta todos os bytes em uma única passada
+            with open(file_path, 'rb') as f:
                 first_line = f.readline()
+            hist = np.bincount(np.frombuffer(first_line, dtype=np.uint8), minlength=256)
             delimiters = [';', ',', '\t', '|']
-            counts = {d: first_line.count(d) for d in delimiters}
+            counts = {d: int(hist[ord(d)]) for d in delimiters}
             return max(counts, key=counts.get) if max(counts.values()) > 0 else ';'
         except:
             return ';'
@@ -673,21 +1214,20 @@ class DataLoaderApp:
             messagebox.showerror("Erro", "Não foi possível ler o arquivo. Verifique o formato e a codificação.")
 
     def execute_loading(self):
-        """Inicia a validação e dispara a thread para o carregamento do CSV."""
+        """Inicia a validação e enfileira o carregamento do CSV na thread de trabalho."""
         file_path = self.file_path.get()
         if not file_path:
             messagebox.showerror("Erro", "Nenhum arquivo selecionado")
             return
-        selected_tables = [table for table, var in self.selected_tables.items() if var.get()]
+        selected_tables = [table for table in self.tables_config if table in self._selected_names]
         if not selected_tables:
             messagebox.showerror("Erro", "Nenhuma tabela de destino selecionada")
             return
         self.load_button.config(state="disabled")
         self.update_progress(0)
         self.log(f"Iniciando processo de carga para o arquivo: {file_path}")
-        thread = threading.Thread(target=self._csv_loader_worker, args=(file_path, selected_tables))
-        thread.daemon = True
-        thread.start()
+        self._job_q.put((self._csv_loader_worker, (file_path, selected_tables)))
+        self._acordar_fila()
 
     def _csv_loader_worker(self, file_path, selected_tables):
         """Executa o trabalho pesado em segundo plano (leitura e carga do CSV)."""
@@ -695,47 +1235,72 @@ class DataLoaderApp:
             delimiter = self.detect_delimiter(file_path)
             self.ui_queue.put({'type': 'log', 'message': f"Delimitador detectado: '{delimiter}'"})
 
-            df = None
-            encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-            for encoding in encodings:
-                try:
-                    df = pd.read_csv(file_path, delimiter=delimiter, header=0, dtype=str, low_memory=False,
-                                     on_bad_lines='warn', encoding=encoding)
-                    self.ui_queue.put({'type': 'log',
-                                       'message': f"Arquivo lido com sucesso (cabeçalho da linha 0) usando codificação: {encoding}"})
-                    break
-                except UnicodeDecodeError:
-                    continue
-            if df is None:
+            encoding = _detectar_codificacao(file_path, ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252'])
+            if encoding is None:
                 raise Exception("Não foi possível ler o arquivo com nenhuma codificação suportada.")
-
-            original_df = df.copy()  # Mantém uma cópia original não modificada
-
-            for i, table_name in enumerate(selected_tables):
+            header = _ler_cabecalho(file_path, delimiter, encoding)
+            self.ui_queue.put({'type': 'log',
+                               'message': f"Arquivo lido com sucesso (cabeçalho da linha 0) usando codificação: {encoding}"})
+
+            # Progresso de cada tabela (cada uma lê o arquivo por conta própria); a barra mostra a média
+            progresso_tabelas = {}
+            trava_progresso = threading.Lock()
+
+            def progresso_da_tabela(table_name):
+                def progress_callback(progress_value):
+                    with trava_progresso:
+                        progresso_tabelas[table_name] = progress_value
+                        media = sum(progresso_tabelas.values()) // len(progresso_tabelas)
+                    self.ui_queue.put({'type': 'csv_progress', 'value': media})
+                return progress_callback
+
+            def processar_tabela(i, table_name):
                 self.ui_queue.put(
                     {'type': 'log', 'message': f"\nProcessando tabela: {table_name} ({i + 1}/{len(selected_tables)})"})
-                try:
-                    column_order = self.tables_config[table_name]
-
-                    if len(original_df.columns) != len(column_order):
-                        error_msg = f"ERRO ESTRUTURAL para '{table_name}': O CSV tem {len(original_df.columns)} colunas, mas a configuração espera {len(column_order)}. Verifique a configuração. Pulando tabela."
-                        self.ui_queue.put({'type': 'error', 'message': error_msg})
-                        continue
-
-                    table_df = original_df.copy()
-                    table_df.columns = column_order
-
-                    table_df = self.convert_data_types(table_df, table_name)
-
-                    def progress_callback(progress_value):
-                        self.ui_queue.put({'type': 'csv_progress', 'value': progress_value})
-
-                    self.db_loader.load_dataframe(table_df, table_name, progress_callback=progress_callback)
-                    self.ui_queue.put({'type': 'log',
-                                       'message': f"Sucesso: {len(table_df)} registros carregados na tabela {table_name}"})
-
-                except Exception as e:
-                    self.ui_queue.put({'type': 'error', 'message': f"Falha ao processar a tabela '{table_name}': {e}"})
+                column_order = self.tables_config[table_name]
+                self.ui_queue.put({'type': 'log', 'message': f"Iniciando conversão de tipos para a tabela: {table_name}"})
+
+                # Posições das colunas de baixa cardinalidade da tabela, lidas como dicionário
+                dicionario = {column_order.index(c) for c in _COLUNAS_DICIONARIO.get(table_name, ())}
+                progress_callback = progresso_da_tabela(table_name)
+
+                def blocos_convertidos():
+                    # Cada tabela lê o arquivo em blocos; só um bloco por tabela fica em memória de cada vez
+                    for bloco in _ler_csv_em_blocos(file_path, delimiter, encoding, progress_callback, dicionario):
+                        bloco.columns = column_order
+                        yield self.convert_data_types(bloco, table_name)
+
+                # Cada tabela usa sua própria conexão do pool e um único COPY alimentado bloco a bloco
+                total = self.db_loader.load_dataframe(blocos_convertidos(), table_name,
+                                                      progress_callback=progress_callback)
+                if total is None:
+                    self.ui_queue.put({'type': 'error', 'message': f"Sem conexão: tabela {table_name} não carregada."})
+                    return
+                self.ui_queue.put({'type': 'log',
+                                   'message': f"Sucesso: {total} registros carregados na tabela {table_name}"})
+
+            # A quantidade de colunas do CSV é fixa: as tabelas incompatíveis são descartadas antes de qualquer leitura
+            ncols = len(header)
+            for table_name in selected_tables:
+                if len(self.tables_config[table_name]) != ncols:
+                    error_msg = f"ERRO ESTRUTURAL para '{table_name}': O CSV tem {ncols} colunas, mas a configuração espera {len(self.tables_config[table_name])}. Verifique a configuração. Pulando tabela."
+                    self.ui_queue.put({'type': 'error', 'message': error_msg})
+            selected_tables = [t for t in selected_tables if len(self.tables_config[t]) == ncols]
+            if not selected_tables:
+                self.ui_queue.put({'type': 'csv_finished', 'success': False})
+                return
+            progresso_tabelas.update(dict.fromkeys(selected_tables, 0))
+
+            # As tabelas não dependem umas das outras, então são carregadas em paralelo (uma conexão por thread)
+            with ThreadPoolExecutor(max_workers=min(len(selected_tables), 4)) as executor:
+                futures = {executor.submit(processar_tabela, i, table_name): table_name
+                           for i, table_name in enumerate(selected_tables)}
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        self.ui_queue.put(
+                            {'type': 'error', 'message': f"Falha ao processar a tabela '{futures[future]}': {e}"})
 
             self.ui_queue.put({'type': 'csv_finished', 'success': True})
 
@@ -749,7 +1314,8 @@ class DataLoaderApp:
         self.sql_predefinido.delete("1.0", "end")
         self.sql_predefinido.insert("1.0", insert_info['sql'].strip())
         if self.executar_automatico.get():
-            self.executar_insert(insert_info['sql'], insert_info['nome'])
+            self.executar_insert([(insert_info['nome'], insert_info['sql'], insert_info.get('paralelo', False))],
+                                 insert_info['nome'])
 
     def executar_insert_selecionado(self):
         """Executa o SQL que está visível na caixa de texto."""
@@ -761,40 +1327,59 @@ class DataLoaderApp:
 
     def executar_inserts_marcados(self):
         """Executa todos os INSERTs que estão marcados, um por um."""
-        inserts_para_executar = [i for i in self.inserts_predefinidos if i['var'].get()]
+        inserts_para_executar = [self.inserts_predefinidos[i] for i in sorted(self._inserts_marcados)]
         if not inserts_para_executar:
             messagebox.showwarning("Aviso", "Nenhum Comando SQL marcado para executar.")
             return
-        full_sql_script = "\n;\n".join([i['sql'] for i in inserts_para_executar])
-        self.executar_insert(full_sql_script, "Lote de Comandos Marcados")
+        scripts = [(i['nome'], i['sql'], i.get('paralelo', False)) for i in inserts_para_executar]
+        self.executar_insert(scripts, "Lote de Comandos Marcados")
 
     def executar_insert(self, sql, nome_tarefa):
-        """Inicia a execução do SQL em uma thread separada."""
+        """
+        Enfileira a execução do SQL na thread de trabalho.
+        'sql' é um script livre (str) ou uma lista de (nome, sql, paralelo) dos comandos pré-definidos.
+        """
         self.toggle_sql_buttons(False)
         self.sql_progress_bar.config(mode='indeterminate')
         self.sql_progress_bar.start(10)
         self.sql_progress_label.config(text=f"Iniciando '{nome_tarefa}'...")
         self.log(f"Iniciando a execução: {nome_tarefa}")
 
-        thread = threading.Thread(target=self._sql_worker, args=(sql, nome_tarefa))
-        thread.daemon = True
-        thread.start()
+        self._job_q.put((self._sql_worker, (sql, nome_tarefa)))
+        self._acordar_fila()
 
     def _sql_worker(self, sql_script, nome_tarefa):
         """Função que roda na thread de background para executar SQL."""
         try:
-            comandos = [cmd.strip() for cmd in sql_script.split(';') if cmd.strip()]
+            if not isinstance(sql_script, str):
+                # Scripts pré-definidos: cada um em uma ida ao servidor (ou como função PL/pgSQL, se configurado)
+                total_scripts = len(sql_script)
+                for i, (nome, sql, paralelo) in enumerate(sql_script, start=1):
+                    self.ui_queue.put(
+                        {'type': 'log', 'message': f"({i}/{total_scripts}) Executando '{nome}'..."})
+                    if paralelo and self.db_loader.sql_paralelo:
+                        self._executar_por_tabela(nome, sql)
+                    else:
+                        self.db_loader.execute_script(nome, sql)
+                    self.ui_queue.put({'type': 'progress', 'value': int(i / total_scripts * 100),
+                                       'text': f"({i}/{total_scripts}) Concluído!"})
+                self.ui_queue.put(
+                    {'type': 'finished', 'success': True, 'message': f"Tarefa '{nome_tarefa}' concluída."})
+                return
+
+            comandos = _separar_comandos(sql_script)
             total_comandos = len(comandos)
             if total_comandos == 0:
                 raise Exception("Nenhum comando SQL válido para executar.")
 
-            for i, comando in enumerate(comandos):
+            def on_lote(fim, total):
                 self.ui_queue.put(
-                    {'type': 'log', 'message': f"({i + 1}/{total_comandos}) Executando para '{nome_tarefa}'..."})
-                self.db_loader.execute_custom_insert(comando)
-                progresso = int(((i + 1) / total_comandos) * 100)
+                    {'type': 'log', 'message': f"({fim}/{total}) Executado para '{nome_tarefa}'."})
                 self.ui_queue.put(
-                    {'type': 'progress', 'value': progresso, 'text': f"({i + 1}/{total_comandos}) Concluído!"})
+                    {'type': 'progress', 'value': int(fim / total * 100), 'text': f"({fim}/{total}) Concluído!"})
+
+            # Lotes de comandos (uma ida ao servidor por lote) em uma única conexão e transação
+            self.db_loader.execute_batches(comandos, on_lote=on_lote)
 
             self.ui_queue.put({'type': 'finished', 'success': True, 'message': f"Tarefa '{nome_tarefa}' concluída."})
 
@@ -802,19 +1387,54 @@ class DataLoaderApp:
             self.ui_queue.put({'type': 'error', 'message': f"Erro na tarefa '{nome_tarefa}': {e}"})
             self.ui_queue.put({'type': 'finished', 'success': False})
 
+    def _executar_por_tabela(self, nome, sql):
+        """
+        Executa os preparatórios do script e depois os grupos de cada tabela em paralelo, um por conexão do pool.
+        NÃO é atômico: cada grupo é confirmado na própria transação, então uma falha deixa as outras tabelas já
+        alteradas. Os UPDATEs de dbd_num/tue/trem trocam códigos por ids e não são idempotentes: depois de uma
+        falha parcial, rodar o script de novo aplica-os duas vezes nas tabelas que já tinham concluído.
+        Por isso só é usado com DB_SQL_PARALELO=1; sem ele o script inteiro roda numa única transação.
+        """
+        preparacao, grupos = _agrupar_por_tabela(sql)
+        if preparacao:
+            self.db_loader.execute_script(f"{nome} preparacao", ';\n'.join(preparacao))
+
+        erros = []
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = {executor.submit(self.db_loader.execute_script, f"{nome} {tabela}", ';\n'.join(comandos)): tabela
+                       for tabela, comandos in grupos.items()}
+            for future in as_completed(futures):
+                tabela = futures[future]
+                try:
+                    future.result()
+                    self.ui_queue.put({'type': 'log', 'message': f"'{nome}': tabela {tabela} concluída."})
+                except Exception as e:
+                    erros.append(f"{tabela}: {e}")
+        if erros:
+            raise Exception(f"Falha em '{nome}' nas tabelas: " + ' | '.join(erros))
+
     def process_queue(self):
         """Processa mensagens da fila da UI. Roda na thread principal."""
+        # Só o último csv_progress de cada ciclo é aplicado à barra; os intermediários são descartados
+        pending_progress = None
+        recebeu = False
         try:
             while True:
                 msg = self.ui_queue.get_nowait()
+                recebeu = True
                 msg_type = msg.get('type')
 
+                if msg_type == 'csv_progress':
+                    pending_progress = msg['value']
+                    continue
+                if pending_progress is not None:
+                    self.update_progress(pending_progress)
+                    pending_progress = None
+
                 if msg_type == 'progress':
                     self.sql_progress_bar.stop()
                     self.sql_progress_bar.config(mode='determinate', value=msg['value'])
                     self.sql_progress_label.config(text=msg.get('text', ''))
-                elif msg_type == 'csv_progress':
-                    self.update_progress(msg['value'])
                 elif msg_type == 'log':
                     self.log(msg['message'])
                 elif msg_type == 'error':
@@ -832,7 +1452,18 @@ class DataLoaderApp:
         except queue.Empty:
             pass
         finally:
-            self.root.after(100, self.process_queue)
+            if pending_progress is not None:
+                self.update_progress(pending_progress)
+            # Polling adaptativo: volta ao intervalo mínimo quando há mensagens, recua quando a fila está vazia
+            self._poll_ms = _POLL_MIN_MS if recebeu else min(self._poll_ms * 2, _POLL_MAX_MS)
+            self._poll_job = self.root.after(self._poll_ms, self.process_queue)
+
+    def _acordar_fila(self):
+        """Antecipa a próxima leitura da ui_queue ao iniciar um trabalho em segundo plano."""
+        if self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+        self._poll_ms = _POLL_MIN_MS
+        self._poll_job = self.root.after(_POLL_MIN_MS, self.process_queue)
 
     def toggle_sql_buttons(self, enabled):
         """Habilita ou desabilita os botões de execução de SQL."""
@@ -844,11 +1475,24 @@ class DataLoaderApp:
         """Adiciona uma mensagem ao log da interface e ao arquivo."""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_msg = f"[{timestamp}] {message}\n"
-        if hasattr(self, 'log_text'):
-            self.log_text.insert('end', log_msg)
-            self.log_text.see('end')
+        # As mensagens são acumuladas e inseridas juntas no widget, no máximo a cada _LOG_FLUSH_MS
+        self._log_buf.append(log_msg)
+        if self._log_flush_job is None:
+            self._log_flush_job = self.root.after(_LOG_FLUSH_MS, self._flush_log)
         logging.info(message)
 
+    def _flush_log(self):
+        """Insere no widget o log acumulado e descarta as linhas mais antigas acima de _LOG_MAX_LINHAS."""
+        self._log_flush_job = None
+        if not hasattr(self, 'log_text') or not self._log_buf:
+            return
+        self.log_text.insert('end', ''.join(self._log_buf))
+        self._log_buf.clear()
+        linhas = int(self.log_text.index('end-1c').split('.')[0])
+        if linhas > _LOG_MAX_LINHAS:
+            self.log_text.delete('1.0', f'{linhas - _LOG_MAX_LINHAS}.0')
+        self.log_text.see('end')
+
 
     def on_closing(self):
         """Ações ao fechar a janela."""
@@ -868,67 +1512,38 @@ class DataLoaderApp:
         """
         Converte os tipos de dados do DataFrame usando NOMES de colunas, não posições.
         Esta versão é mais robusta, legível e corrige o erro 'column "0" does not exist'.
+        Só as colunas alteradas são recriadas; as demais continuam compartilhadas com o DataFrame de origem.
         """
-        df_copy = df.copy()
-        self.log(f"Iniciando conversão de tipos para a tabela: {table_name}")
-
+        # Roda nas threads de carga (uma vez por bloco): não toca em widgets, só no logging, que é thread-safe
         try:
             # --- PASSO 1: LIMPEZA GERAL (APLICADA A TODAS AS TABELAS) ---
-            # Itera sobre todas as colunas para remover espaços em branco e padronizar nulos.
-            for col_name in df_copy.columns:
-                if pd.api.types.is_object_dtype(df_copy[col_name]):
-                    df_copy[col_name] = df_copy[col_name].str.strip()
-                    df_copy[col_name].replace(['', 'nan', 'NaN', 'None', 'NULL', 'null', 'NaT', '<NA>'], None,
-                                              inplace=True)
+            # Remove espaços em branco e padroniza nulos, com um único regex por coluna de texto.
+            # Cópia rasa: só as colunas reatribuídas são substituídas (df.assign faria cópia profunda de tudo)
+            resultado = df.copy(deep=False)
+            for col_name in df.columns:
+                dtype = df[col_name].dtype
+                if isinstance(dtype, pd.CategoricalDtype):
+                    resultado[col_name] = _limpar_categorias(df[col_name])
+                elif pd.api.types.is_string_dtype(dtype):
+                    valores = df[col_name].str.strip()
+                    resultado[col_name] = valores.mask(valores.str.fullmatch(_PADRAO_NULOS, na=False))
 
             # --- PASSO 2: CONVERSÕES ESPECÍFICAS POR TABELA ---
-            # Adicione aqui suas regras de negócio, usando os nomes das colunas.
-
-            if table_name == 'tab01':
-                self.log("Aplicando regras para tab01...")
-                # Exemplo: Converte colunas para numérico, tratando erros.
-                df_copy['viagens'] = pd.to_numeric(df_copy['viagens'], errors='coerce')
-                df_copy['disp_frota'] = pd.to_numeric(df_copy['disp_frota'], errors='coerce')
-                # A coluna tempo_percurso pode ser convertida para pd.to_timedelta se necessário.
-
-            elif table_name == 'tab02':
-                self.log("Aplicando regras para tab02...")
-                # CORREÇÃO: Usa os nomes das colunas, e não os índices 0, 1, 10, etc.
-                df_copy['data_completa'] = pd.to_datetime(df_copy['data_completa'], format='%d/%m/%Y', errors='coerce')
-
-                # Converte 'valor' para numérico, tratando vírgula decimal
-                if 'valor' in df_copy.columns:
-                    df_copy['valor'] = df_copy['valor'].str.replace(',', '.', regex=False)
-                    df_copy['valor'] = pd.to_numeric(df_copy['valor'], errors='coerce')
-
-                # Converte colunas que devem ser inteiras
-                colunas_int = ['entrada_id', 'cod_estacao', 'bloqueio_id', 'user_id']
-                for col in colunas_int:
-                    if col in df_copy.columns:
-                        df_copy[col] = pd.to_numeric(df_copy[col], errors='coerce').astype(
-                            'Int64')  # 'Int64' suporta nulos
-
-            elif table_name == 'tab103':
-                self.log("Aplicando regras para tab03...")
-                df_copy['Dia'] = pd.to_datetime(df_copy['Dia'], format='%d/%m/%Y', errors='coerce')
-                # Exemplo para colunas de hora
-                colunas_hora = ['HoraInicioPrevista', 'HoraInicioReal', 'HoraFimPrevista', 'HoraFimReal']
-                for col in colunas_hora:
-                    if col in df_copy.columns:
-                        df_copy[col] = pd.to_datetime(df_copy[col], format='%H:%M:%S', errors='coerce').dt.time
-
-            #
-            # >>> ADICIONE AQUI os blocos 'elif table_name == ...' para as outras tabelas <<<
-            # Siga o padrão de usar os nomes das colunas.
-            #
-
-            self.log(f"Conversão de tipos para '{table_name}' concluída.")
-            # Remove linhas que possam ter ficado inteiramente vazias após as conversões
-            df_copy.dropna(how='all', inplace=True)
-            return df_copy
+            # Uma consulta ao registro de conversores (_CONVERSORES), sem cadeia de if/elif por tabela.
+            conversor = self._converters.get(table_name)
+            if conversor:
+                for col_name, valores in conversor(resultado).items():
+                    resultado[col_name] = valores
+
+            # Remove linhas que possam ter ficado inteiramente vazias (em qualquer posição do bloco).
+            # A máscara de nulos é checada antes: sem linha vazia, o bloco segue sem a cópia do dropna.
+            vazias = resultado.isna().all(axis=1)
+            if vazias.any():
+                resultado = resultado[~vazias]
+            return resultado
 
         except Exception as e:
-            self.log(f"ERRO CRÍTICO na conversão de tipos para a tabela {table_name}: {e}")
+            logging.error(f"ERRO CRÍTICO na conversão de tipos para a tabela {table_name}: {e}")
             # Re-lança a exceção para que a thread principal saiba que algo deu errado.
             raise e
 
@@ -1,19 +1,313 @@
 import pandas as pd
 import psycopg2
-from io import StringIO
+import psycopg2.pool
+from psycopg2 import sql
+from io import RawIOBase
+import gzip
 import logging
 import os
+import queue
+import shlex
+import struct
+import tempfile
+import threading
+import uuid
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+# Opcionais: pyarrow (conversão DataFrame -> Arrow) e driver ADBC (COPY binário direto de dados Arrow)
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+try:
+    import adbc_driver_postgresql.dbapi as adbc_pg
+except ImportError:
+    adbc_pg = None
 
 # Configuração básica de log para vermos tudo
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
+# --- FORMATO BINÁRIO DO COPY ---
+# Assinatura de 11 bytes + flags (int32) + tamanho da extensão do cabeçalho (int32); fim = contagem -1
+_PGCOPY_CABECALHO = b'PGCOPY\n\377\r\n\0' + struct.pack('>ii', 0, 0)
+_PGCOPY_FIM = struct.pack('>h', -1)
+# Structs compiladas uma vez: contagem de campos da linha e tamanho de campo
+_CAMPOS = struct.Struct('>h')
+_TAMANHO = struct.Struct('>i')
+_NULO = _TAMANHO.pack(-1)
+# dtype do pandas -> (tipo no PostgreSQL, dtype NumPy big-endian do valor no COPY binário)
+_FORMATOS_FIXOS = {
+    np.dtype('int16'): ('int2', '>i2'),
+    np.dtype('int32'): ('int4', '>i4'),
+    np.dtype('int64'): ('int8', '>i8'),
+    np.dtype('float64'): ('float8', '>f8'),
+    np.dtype('datetime64[ns]'): ('timestamp', '>i8'),
+}
+# Tipos de texto do PostgreSQL que aceitam os bytes UTF-8 do campo sem conversão
+_TIPOS_TEXTO = ('text', 'varchar', 'bpchar')
+# 2000-01-01 (época do PostgreSQL) em microssegundos desde 1970-01-01
+_EPOCA_PG_US = 946_684_800_000_000
+# Linhas serializadas por vez: o COPY consome um bloco enquanto o próximo ainda não existe em memória
+_LINHAS_POR_BLOCO = 50_000
+
+
+def _tipo_binario(dtype) -> str | None:
+    """Tipo do PostgreSQL que a coluna produz no COPY binário, ou None se o dtype não tem codificador."""
+    if dtype in _FORMATOS_FIXOS:
+        return _FORMATOS_FIXOS[dtype][0]
+    if isinstance(dtype, pd.CategoricalDtype) or dtype == object or pd.api.types.is_string_dtype(dtype):
+        return 'text'
+    return None
+
+
+def _registros_fixos(colunas: list, contagem: int = None) -> np.ndarray:
+    """
+    Array estruturado big-endian com (tamanho int32, valor) de cada coluna de largura fixa, um registro por
+    linha: o NumPy converte e reordena os bytes de cada coluna inteira de uma vez, sem struct.pack por
+    célula. Com contagem, cada registro começa pela contagem de campos (int16) da linha do COPY.
+    """
+    campos = [('n', '>i2')] if contagem is not None else []
+    for k, serie in enumerate(colunas):
+        campos += [(f't{k}', '>i4'), (f'v{k}', _FORMATOS_FIXOS[serie.dtype][1])]
+    registros = np.empty(len(colunas[0]), dtype=campos)
+    if contagem is not None:
+        registros['n'] = contagem
+    for k, serie in enumerate(colunas):
+        registros[f't{k}'] = registros.dtype[f'v{k}'].itemsize
+        valores = serie.to_numpy()
+        if serie.dtype.kind == 'M':
+            valores = valores.astype('datetime64[us]').view('int64') - _EPOCA_PG_US
+        registros[f'v{k}'] = valores
+    return registros
+
+
+def _fatiar_registros(registros: np.ndarray) -> list:
+    """Bytes de cada registro do array estruturado, fatiados de um único tobytes()."""
+    dados, largura = registros.tobytes(), registros.itemsize
+    return [dados[i:i + largura] for i in range(0, len(dados), largura)]
+
+
+def _codificar_coluna(serie: pd.Series) -> list:
+    """Codifica cada valor da coluna como campo do COPY binário (tamanho + bytes), com o codificador do dtype."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Codifica só as categorias distintas; as linhas reaproveitam os mesmos bytes pelo código (-1 = nulo)
+        campos = _codificar_coluna(pd.Series(serie.cat.categories.astype(str))) + [_NULO]
+        return [campos[codigo] for codigo in serie.cat.codes.tolist()]
+    nulos = serie.isna().to_numpy()
+    if serie.dtype in _FORMATOS_FIXOS:
+        # Coluna fixa com nulos: os campos vêm do array estruturado e os nulos trocam o campo por tamanho -1
+        return [_NULO if nulo else campo for campo, nulo in zip(_fatiar_registros(_registros_fixos([serie])), nulos)]
+    campos = []
+    for v, nulo in zip(serie.tolist(), nulos):
+        if nulo:
+            campos.append(_NULO)
+        else:
+            texto = str(v).encode('utf-8')
+            campos.append(_TAMANHO.pack(len(texto)) + texto)
+    return campos
+
+
+def _codificar_bloco(bloco: pd.DataFrame) -> bytes:
+    """
+    Codifica as linhas do bloco no formato binário do COPY. Se todas as colunas têm largura fixa e nenhum
+    nulo, o bloco inteiro é um único array estruturado (contagem + campos) e sai com um só tobytes().
+    Senão, cada sequência de colunas fixas sem nulos vira um trecho de bytes por linha e as demais colunas
+    são codificadas por célula, e as partes de cada linha são unidas.
+    """
+    colunas = [bloco.iloc[:, i] for i in range(bloco.shape[1])]
+    fixas = [serie.dtype in _FORMATOS_FIXOS and not serie.isna().any() for serie in colunas]
+    if all(fixas):
+        return _registros_fixos(colunas, contagem=len(colunas)).tobytes()
+    partes = [[_CAMPOS.pack(len(colunas))] * len(bloco)]
+    i = 0
+    while i < len(colunas):
+        if fixas[i]:
+            fim = i
+            while fim < len(colunas) and fixas[fim]:
+                fim += 1
+            partes.append(_fatiar_registros(_registros_fixos(colunas[i:fim])))
+            i = fim
+        else:
+            partes.append(_codificar_coluna(colunas[i]))
+            i += 1
+    return b''.join(b''.join(linha) for linha in zip(*partes))
+
+
+def _df_to_pg_binary(df: pd.DataFrame, linhas_por_bloco: int = _LINHAS_POR_BLOCO):
+    """
+    Gera o DataFrame no formato binário do COPY (FORMAT BINARY), sem formatação de texto célula a célula,
+    em blocos de bytes de até linhas_por_bloco linhas.
+    """
+    yield _PGCOPY_CABECALHO
+    for inicio in range(0, len(df), linhas_por_bloco):
+        yield _codificar_bloco(df.iloc[inicio:inicio + linhas_por_bloco])
+    yield _PGCOPY_FIM
+
+
+class _LeitorAntecipado(RawIOBase):
+    """
+    Arquivo somente leitura alimentado por uma thread que gera os blocos de bytes à frente do COPY:
+    enquanto o psycopg2 envia um bloco (sem o GIL), o próximo já está sendo codificado.
+    A fila limitada segura no máximo 'blocos_a_frente' blocos prontos em memória.
+    """
+
+    def __init__(self, blocos, blocos_a_frente: int = 2):
+        self._fila = queue.Queue(maxsize=blocos_a_frente)
+        self._atual = b''
+        self._pos = 0
+        self._erro = None
+        self._cancelado = False
+        threading.Thread(target=self._produzir, args=(blocos,), daemon=True).start()
+
+    def _produzir(self, blocos):
+        try:
+            for bloco in blocos:
+                if self._cancelado:
+                    break
+                self._fila.put(bloco)
+        except Exception as e:
+            self._erro = e
+        finally:
+            self._fila.put(None)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        # _atual None = fim do fluxo (já recebido o marcador da thread produtora)
+        while self._atual is not None and self._pos >= len(self._atual):
+            self._atual, self._pos = self._fila.get(), 0
+        if self._atual is None:
+            if self._erro:
+                raise self._erro
+            return 0
+        n = min(len(b), len(self._atual) - self._pos)
+        b[:n] = memoryview(self._atual)[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def close(self):
+        # COPY interrompido: libera a thread produtora, que pode estar bloqueada com a fila cheia
+        self._cancelado = True
+        while self._atual is not None:
+            self._atual = self._fila.get()
+        super().close()
+
+
+# --- LEITOR EM BLOCOS PARA O COPY EM TEXTO ---
+# Caracteres especiais do COPY em texto e o que entra no lugar: escape (sem perda) ou espaço (sanitize=True)
+_ESCAPES_COPY = (('\\', '\\\\'), ('\t', '\\t'), ('\n', '\\n'), ('\r', '\\r'))
+_ESPACOS_COPY = (('\\', '\\\\'), ('\t', ' '), ('\n', ' '), ('\r', ' '))
+
+
+def _texto_para_copy(textos: pd.Series, sanitize: bool = False) -> pd.Series:
+    """
+    Prepara textos para o COPY em texto: barra invertida, tab e quebras de linha saem escapados (\\\\, \\t,
+    \\n, \\r); com sanitize=True, tab e quebras de linha viram espaço. Uma busca vetorizada evita as trocas
+    quando a coluna não tem nenhum desses caracteres.
+    """
+    if not textos.str.contains(r'[\\\t\n\r]', regex=True).any():
+        return textos
+    for especial, troca in (_ESPACOS_COPY if sanitize else _ESCAPES_COPY):
+        textos = textos.str.replace(especial, troca, regex=False)
+    return textos
+
+
+def _bloco_em_texto(bloco: pd.DataFrame, sanitize: bool = False) -> bytes:
+    """
+    Serializa o bloco no formato texto do COPY: cada coluna vira uma lista de textos de uma vez (astype(str)
+    em C do NumPy) e as linhas são unidas com str.join, sem o laço célula a célula do to_csv e sem as
+    strings de largura fixa do np.char. Nulos saem como campo vazio. As máscaras de nulos são calculadas por coluna
+    uma única vez: colunas inteiramente nulas viram campos vazios e colunas sem nulos dispensam a máscara.
+    Textos e categorias passam por _texto_para_copy (com o sanitize informado); os demais dtypes (datas,
+    durações, Int64, pd.ArrowDtype) usam o astype(str) do pandas com os nulos mascarados, então todo bloco
+    segue por este caminho e o sanitize vale para todos eles.
+    """
+    nulos = bloco.isna()
+    todos_nulos, algum_nulo = nulos.all().to_numpy(), nulos.any().to_numpy()
+    colunas = []
+    for i in range(bloco.shape[1]):
+        serie = bloco.iloc[:, i]
+        if todos_nulos[i]:
+            colunas.append([''] * len(bloco))
+        elif isinstance(serie.dtype, pd.CategoricalDtype):
+            categorias = _texto_para_copy(pd.Series(serie.cat.categories.astype(str)), sanitize)
+            rotulos = np.append(categorias.to_numpy(dtype=object), '')
+            colunas.append(rotulos[serie.cat.codes.to_numpy()].tolist())  # código -1 (nulo) pega o '' do fim
+        elif isinstance(serie.dtype, np.dtype) and serie.dtype.kind in 'iu':
+            colunas.append(serie.to_numpy().astype(str).tolist())
+        elif isinstance(serie.dtype, np.dtype) and serie.dtype.kind == 'f':
+            valores = serie.to_numpy()
+            colunas.append(np.where(np.isnan(valores), '', valores.astype(str)).tolist())
+        else:
+            textos = serie.astype(str)
+            if serie.dtype == object or pd.api.types.is_string_dtype(serie.dtype):
+                textos = _texto_para_copy(textos, sanitize)
+            if algum_nulo[i]:
+                textos = textos.mask(nulos.iloc[:, i], '')
+            colunas.append(textos.tolist())
+    return ('\n'.join(map('\t'.join, zip(*colunas))) + '\n').encode('utf-8')
+
+
+class ChunkedCsvReader(RawIOBase):
+    """
+    Arquivo somente leitura que serializa o DataFrame (texto separado por tab) bloco a bloco, conforme o
+    COPY lê; só o bloco atual fica em memória, e readinto copia direto dos bytes dele.
+    """
+
+    def __init__(self, df: pd.DataFrame, linhas_por_bloco: int = _LINHAS_POR_BLOCO, sanitize: bool = False):
+        self._df = df
+        self._sanitize = sanitize
+        self._linhas_por_bloco = linhas_por_bloco
+        self._proxima_linha = 0
+        self._bloco = b''
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def _encher(self):
+        """Serializa o próximo bloco de linhas quando o anterior já foi todo consumido."""
+        while self._pos >= len(self._bloco) and self._proxima_linha < len(self._df):
+            bloco = self._df.iloc[self._proxima_linha:self._proxima_linha + self._linhas_por_bloco]
+            self._proxima_linha += self._linhas_por_bloco
+            self._bloco, self._pos = _bloco_em_texto(bloco, self._sanitize), 0
+
+    def readinto(self, b):
+        self._encher()
+        n = min(len(b), len(self._bloco) - self._pos)
+        b[:n] = memoryview(self._bloco)[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+
+def _comando_copy(table_name_qualified: str, colunas, origem: sql.Composable, opcoes: str) -> sql.Composed:
+    """COPY tabela (colunas) FROM origem WITH (opcoes), com tabela e colunas citadas como identificadores."""
+    return sql.SQL("COPY {} ({}) FROM {} WITH ({})").format(
+        sql.Identifier(*table_name_qualified.split('.', 1)),
+        sql.SQL(', ').join(map(sql.Identifier, colunas)),
+        origem, sql.SQL(opcoes))
+
+
+def _df_para_arrow(df: pd.DataFrame):
+    """DataFrame -> tabela Arrow (sem o índice) para load_arrow_fast."""
+    if pa is None:
+        raise ImportError("pyarrow não instalado: necessário para converter o DataFrame para Arrow.")
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
 # ==============================================================================
 # COLE A SUA CLASSE 'PostgreSQLDataLoader' COMPLETA E SEM MODIFICAÇÕES AQUI
 # Copie a classe inteira do seu script principal e cole neste espaço.
 # ==============================================================================
 class PostgreSQLDataLoader:
+    # Pools compartilhados por todas as instâncias (um por configuração de conexão), criados sob demanda
+    _pools = {}
+    _pools_lock = threading.Lock()
+
     def __init__(self, db_config=None):
         if db_config:
             self.schema = db_config.pop('schema', os.getenv('DB_SCHEMA', 'migracao'))
@@ -23,16 +317,42 @@ class PostgreSQLDataLoader:
             self.db_config = {'dbname': os.getenv('DB_NAME', 'metro_bh'), 'user': os.getenv('DB_USER', 'postgres'),
                               'password': os.getenv('DB_PASS', '123456'), 'host': os.getenv('DB_HOST', 'localhost'),
                               'port': os.getenv('DB_PORT', '5432')}
+        # Diretório visível pelo cliente e pelo servidor (mesmo caminho nos dois) para o COPY comprimido
+        self.compressed_copy_dir = self.db_config.pop('compressed_copy_dir', None)
+        # Keepalive do TCP para cargas longas em banco remoto (conexões ociosas no meio do ETL)
+        self.db_config.setdefault('keepalives', 1)
+        self.db_config.setdefault('keepalives_idle', 30)
+        # search_path e ajustes de sessão para COPY em massa definidos na abertura de cada conexão do pool.
+        # wal_compression e commit_delay exigem superusuário e ficam a cargo da configuração do servidor.
+        self.db_config['options'] = (f'-c search_path={self.schema} -c synchronous_commit=off '
+                                     f'-c maintenance_work_mem=512MB')
         self.conn = None
-        self.connect()
+        # Conexões extras da carga paralela, abertas sob demanda e reaproveitadas entre chamadas
+        self._conexoes_paralelas = []
+        # Sem conexão na construção: a primeira carga (ou connect()) retira uma conexão do pool
+
+    def _pool(self):
+        """Pool desta configuração, criado na primeira conexão e reaproveitado por todas as instâncias."""
+        chave = tuple(sorted(self.db_config.items()))
+        with self._pools_lock:
+            pool = self._pools.get(chave)
+            if pool is None or pool.closed:
+                pool = self._pools[chave] = psycopg2.pool.ThreadedConnectionPool(minconn=1, maxconn=8,
+                                                                                 **self.db_config)
+            return pool
+
+    def _nova_conexao(self):
+        """Retira do pool uma conexão (já com o search_path do schema configurado)."""
+        return self._pool().getconn()
+
+    def _devolver(self, conn):
+        """Devolve a conexão ao pool (conexões fechadas são descartadas)."""
+        self._pool().putconn(conn, close=bool(conn.closed))
 
     def connect(self):
         try:
-            if self.conn and not self.conn.closed: self.conn.close()
-            self.conn = psycopg2.connect(**self.db_config)
-            with self.conn.cursor() as cursor:
-                cursor.execute(f"SET search_path TO {self.schema}")
-            self.conn.commit()
+            if self.conn: self._devolver(self.conn)
+            self.conn = self._nova_conexao()
             logging.info(f"Conexão com PostgreSQL estabelecida. Schema '{self.schema}' definido.")
             return True
         except Exception as e:
@@ -40,32 +360,328 @@ class PostgreSQLDataLoader:
             self.conn = None
             return False
 
-    def load_dataframe_fast(self, df: pd.DataFrame, table_name: str) -> (bool, str):
-        if not self.conn or self.conn.closed:
+    def _ensure_conn(self) -> bool:
+        """Conecta na primeira utilização (ou se a conexão caiu)."""
+        if self.conn and not self.conn.closed:
+            return True
+        return self.connect()
+
+    def _tipos_destino(self, cursor, table_name_qualified: str) -> dict:
+        """Nome do tipo (pg_type.typname) de cada coluna da tabela de destino."""
+        cursor.execute(
+            "SELECT a.attname, t.typname FROM pg_attribute a JOIN pg_type t ON t.oid = a.atttypid "
+            "WHERE a.attrelid = %s::regclass AND a.attnum > 0 AND NOT a.attisdropped",
+            (table_name_qualified,))
+        return dict(cursor.fetchall())
+
+    def _aceita_binario(self, cursor, df: pd.DataFrame, table_name_qualified: str) -> bool:
+        """O COPY binário exige que cada coluna chegue exatamente no tipo da coluna de destino."""
+        destino = self._tipos_destino(cursor, table_name_qualified)
+        for col in df.columns:
+            tipo = _tipo_binario(df[col].dtype)
+            alvo = destino.get(col)
+            if tipo is None or alvo is None or (alvo != tipo and not (tipo == 'text' and alvo in _TIPOS_TEXTO)):
+                return False
+        return True
+
+    def _copy(self, conn, df: pd.DataFrame, table_name_qualified: str, binary: bool, freeze: bool = False,
+              sanitize: bool = False):
+        """
+        Envia o DataFrame com um COPY na conexão informada, sem commit; retorna as linhas copiadas.
+        freeze=True exige que a tabela tenha sido criada ou truncada na transação atual.
+        """
+        opcao_freeze = ', FREEZE' if freeze else ''
+        with conn.cursor() as cursor:
+            if binary and self._aceita_binario(cursor, df, table_name_qualified):
+                if self.compressed_copy_dir:
+                    return self._copy_comprimido(cursor, df, table_name_qualified, opcao_freeze)
+                logging.info(f"Executando COPY FROM (binário) para a tabela '{table_name_qualified}'...")
+                with _LeitorAntecipado(_df_to_pg_binary(df)) as leitor:
+                    comando = _comando_copy(table_name_qualified, df.columns, sql.SQL('STDIN'),
+                                            f"FORMAT BINARY{opcao_freeze}")
+                    cursor.copy_expert(comando.as_string(cursor), leitor)
+            else:
+                # Tipos sem codificador binário (ou diferentes do destino): o servidor converte o texto,
+                # serializado em blocos à medida que o COPY consome
+                logging.info(f"Executando COPY FROM para a tabela '{table_name_qualified}'...")
+                comando = _comando_copy(table_name_qualified, df.columns, sql.SQL('STDIN'),
+                                        f"DELIMITER E'\\t', NULL ''{opcao_freeze}")
+                cursor.copy_expert(comando.as_string(cursor), ChunkedCsvReader(df, sanitize=sanitize))
+            return cursor.rowcount
+
+    def _copy_comprimido(self, cursor, df: pd.DataFrame, table_name_qualified: str, opcao_freeze: str):
+        """
+        Grava o COPY binário comprimido com gzip em compressed_copy_dir e o servidor lê o arquivo com
+        COPY ... FROM PROGRAM 'gzip -dc', trocando CPU por banda em links lentos. Exige um diretório
+        compartilhado (mesmo caminho no cliente e no servidor) e o papel pg_execute_server_program.
+        O programa roda como o usuário do SO do servidor (postgres), não como o cliente: o arquivo recebe o
+        grupo do diretório compartilhado e modo 0640 (sem leitura para outros usuários). O diretório deve
+        pertencer a um grupo do qual o usuário do servidor e o do cliente façam parte (de preferência com
+        setgid, ex.: chgrp postgres dir && chmod 2770 dir).
+        """
+        fd, caminho = tempfile.mkstemp(suffix='.pgcopy.gz', dir=self.compressed_copy_dir)
+        try:
+            # mkstemp cria com 0600, ilegível para o usuário do servidor: libera só a leitura pelo grupo
+            os.fchown(fd, -1, os.stat(self.compressed_copy_dir).st_gid)
+            os.fchmod(fd, 0o640)
+            with os.fdopen(fd, 'wb') as arquivo, gzip.GzipFile(fileobj=arquivo, mode='wb', compresslevel=1) as gz:
+                for bloco in _df_to_pg_binary(df):
+                    gz.write(bloco)
+            logging.info(f"Executando COPY FROM PROGRAM comprimido para a tabela '{table_name_qualified}'...")
+            programa = sql.SQL('PROGRAM {}').format(sql.Literal(f"gzip -dc {shlex.quote(caminho)}"))
+            cursor.execute(_comando_copy(table_name_qualified, df.columns, programa, f"FORMAT BINARY{opcao_freeze}"))
+            return cursor.rowcount
+        finally:
+            os.remove(caminho)
+
+    def _remover_indices(self, table_name_qualified: str) -> list:
+        """Remove os índices comuns da tabela (sem restrição nem partição anexada); retorna o DDL deles."""
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+                "WHERE i.indrelid = %s::regclass AND NOT i.indisunique AND NOT i.indisprimary "
+                # Índices de restrições (ex.: EXCLUDE) e de partições anexados ao índice do pai não aceitam DROP
+                "AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid) "
+                "AND NOT EXISTS (SELECT 1 FROM pg_inherits h WHERE h.inhrelid = i.indexrelid)",
+                (table_name_qualified,))
+            indices = cursor.fetchall()
+            for nome, _ in indices:
+                cursor.execute(f"DROP INDEX {nome}")
+        if indices:
+            logging.info(f"{len(indices)} índice(s) de '{table_name_qualified}' removido(s) durante a carga.")
+        return [definicao for _, definicao in indices]
+
+    def load_dataframe_fast(self, df: pd.DataFrame, table_name: str, binary: bool = True,
+                            unlogged: bool = False, staging: bool = False, freeze: bool = False,
+                            drop_indexes: bool = False, sanitize: bool = False) -> (bool, str):
+        """
+        Carrega o DataFrame com um único COPY e commit.
+        unlogged=True (só para tabelas que podem ser recarregadas) passa a tabela para UNLOGGED, se ainda não
+        estiver, e a DEIXA assim: os COPYs seguintes não geram WAL, mas o conteúdo é perdido numa queda do
+        servidor e não vai para réplicas. Ao fim de toda a carga, chame definir_logged uma vez por tabela;
+        o SET LOGGED reescreve a tabela inteira no WAL (a economia só vem de várias cargas entre as trocas).
+        staging=True faz o COPY numa tabela TEMP (sem WAL), descartada no commit, e passa as linhas para a
+        tabela final com um único INSERT ... SELECT na mesma transação.
+        freeze=True é para a carga inicial: TRUNCATE da tabela (o conteúdo atual é substituído) e COPY ... FREEZE
+        na mesma transação, gravando as linhas já congeladas (sem o VACUUM FREEZE posterior). O FREEZE exige
+        que a tabela tenha sido criada ou truncada na transação do COPY.
+        drop_indexes=True remove os índices comuns (não únicos, fora a PK) antes do COPY e os recria com a
+        mesma definição depois, na mesma transação: cada índice é montado uma vez, e não linha a linha.
+        sanitize=True (entradas de ETL já conhecidas) troca tab/quebras de linha por espaço nas colunas de
+        texto do COPY em texto; sem ele, esses caracteres são enviados escapados e chegam intactos.
+        """
+        if not self._ensure_conn():
             logging.error("A conexão não existe ou está fechada ANTES de tentar o COPY.")
             return False, "Sem conexão com o banco de dados."
 
         table_name_qualified = f"{self.schema}.{table_name}"
         logging.info(f"--- Iniciando teste de carga para '{table_name_qualified}' ---")
 
-        buffer = StringIO()
-        df.to_csv(buffer, sep='\t', header=False, index=False, na_rep='')
-        buffer.seek(0)
+        try:
+            # Mesmo identificador citado (psycopg2.sql) em todos os comandos da carga, como no COPY
+            tabela = sql.Identifier(self.schema, table_name)
+            if unlogged:
+                with self.conn.cursor() as cursor:
+                    cursor.execute("SELECT relpersistence FROM pg_class WHERE oid = %s::regclass",
+                                   (table_name_qualified,))
+                    if cursor.fetchone()[0] != 'u':
+                        cursor.execute(sql.SQL("ALTER TABLE {} SET UNLOGGED").format(tabela))
+            if freeze:
+                with self.conn.cursor() as cursor:
+                    cursor.execute(sql.SQL("TRUNCATE {}").format(tabela))
+            indices = self._remover_indices(table_name_qualified) if drop_indexes else []
+            if staging:
+                staging_name = f"_stg_{table_name}"
+                colunas = sql.SQL(', ').join(map(sql.Identifier, df.columns))
+                with self.conn.cursor() as cursor:
+                    cursor.execute(sql.SQL("CREATE TEMP TABLE {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP").format(
+                        sql.Identifier(staging_name), tabela))
+                self._copy(self.conn, df, staging_name, binary, freeze, sanitize)
+                with self.conn.cursor() as cursor:
+                    cursor.execute(sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {}").format(
+                        tabela, colunas, colunas, sql.Identifier(staging_name)))
+                    registros = cursor.rowcount
+            else:
+                registros = self._copy(self.conn, df, table_name_qualified, binary, freeze, sanitize)
+            if indices:
+                with self.conn.cursor() as cursor:
+                    for definicao in indices:
+                        cursor.execute(definicao)
+            self.conn.commit()
+            return True, f"{registros} registros carregados com sucesso via COPY."
+        except Exception as e:
+            if self.conn: self.conn.rollback()
+            logging.error(f"Erro ao usar COPY FROM na tabela {table_name}: {e}")
+            return False, str(e)
+
+    def load_arrow_fast(self, reader, table_name: str) -> (bool, str):
+        """
+        Carrega dados Arrow (pa.RecordBatchReader ou pa.Table) com o driver ADBC do PostgreSQL, que envia
+        COPY binário direto dos buffers Arrow. Use _df_para_arrow para mandar um DataFrame por este caminho.
+        """
+        if adbc_pg is None:
+            return False, "Driver adbc_driver_postgresql não instalado."
+        uri = (f"postgresql://{quote(str(self.db_config['user']), safe='')}:"
+               f"{quote(str(self.db_config['password']), safe='')}@{self.db_config['host']}:"
+               f"{self.db_config['port']}/{self.db_config['dbname']}")
+        logging.info(f"--- Iniciando carga Arrow (ADBC) para '{self.schema}.{table_name}' ---")
+        try:
+            with adbc_pg.connect(uri) as conn:
+                with conn.cursor() as cursor:
+                    registros = cursor.adbc_ingest(table_name, reader, mode='append', db_schema_name=self.schema)
+                conn.commit()
+            return True, f"{registros} registros carregados com sucesso via ADBC."
+        except Exception as e:
+            logging.error(f"Erro na carga ADBC na tabela {table_name}: {e}")
+            return False, str(e)
+
+    def definir_logged(self, table_names) -> (bool, str):
+        """Devolve a LOGGED as tabelas carregadas com unlogged=True (uma reescrita no WAL por tabela)."""
+        if not self._ensure_conn():
+            return False, "Sem conexão com o banco de dados."
         try:
             with self.conn.cursor() as cursor:
-                logging.info(f"Executando COPY FROM para a tabela '{table_name_qualified}'...")
-                cursor.copy_from(buffer, table_name_qualified, sep='\t', null="", columns=df.columns)
+                for table_name in table_names:
+                    cursor.execute(sql.SQL("ALTER TABLE {} SET LOGGED").format(sql.Identifier(self.schema, table_name)))
             self.conn.commit()
-            return True, f"{len(df)} registros carregados com sucesso via COPY."
+            return True, f"{len(table_names)} tabela(s) de volta a LOGGED."
+        except Exception as e:
+            if self.conn: self.conn.rollback()
+            logging.error(f"Erro ao devolver as tabelas a LOGGED: {e}")
+            return False, str(e)
+
+    def load_many(self, df_table_pairs, binary: bool = True) -> (bool, str):
+        """
+        Carrega vários (DataFrame, tabela) numa única transação, com um COPY por par e um só commit no fim
+        (um fsync em vez de um por tabela). Qualquer falha desfaz todas as cargas.
+        """
+        if not self._ensure_conn():
+            logging.error("A conexão não existe ou está fechada ANTES de tentar o COPY.")
+            return False, "Sem conexão com o banco de dados."
+
+        table_name = None
+        try:
+            registros = 0
+            for df, table_name in df_table_pairs:
+                registros += self._copy(self.conn, df, f"{self.schema}.{table_name}", binary)
+            self.conn.commit()
+            return True, f"{registros} registros carregados com sucesso via COPY."
         except Exception as e:
             if self.conn: self.conn.rollback()
             logging.error(f"Erro ao usar COPY FROM na tabela {table_name}: {e}")
             return False, str(e)
 
+    @staticmethod
+    def _aceita_duas_fases(conn, n_transacoes: int) -> bool:
+        """True se o servidor aceita n_transacoes preparadas ao mesmo tempo (max_prepared_transactions)."""
+        with conn.cursor() as cursor:
+            cursor.execute("SHOW max_prepared_transactions")
+            limite = int(cursor.fetchone()[0])
+        conn.rollback()  # encerra a transação aberta pelo SHOW antes do tpc_begin
+        return limite >= n_transacoes
+
+    @staticmethod
+    def _desfazer(conn, duas_fases: bool):
+        """Desfaz a transação de uma fatia; uma falha aqui vai só para o log, sem esconder o erro original."""
+        if conn.closed:
+            return
+        try:
+            if duas_fases:
+                conn.tpc_rollback()
+            else:
+                conn.rollback()
+        except Exception as e:
+            logging.error(f"Falha ao desfazer a transação de uma fatia da carga paralela: {e}")
+
+    def load_dataframe_parallel(self, df: pd.DataFrame, table_name: str, n_workers: int = None,
+                                binary: bool = True) -> (bool, str):
+        """
+        Divide o DataFrame em n_workers fatias de linhas e envia cada uma com seu próprio COPY, em paralelo,
+        uma conexão por fatia (o psycopg2 libera o GIL durante o COPY). Se o servidor permite ao menos
+        n_workers transações preparadas (SHOW max_prepared_transactions; o padrão é 0), as conexões usam
+        commit em duas fases: cada fatia é preparada (PREPARE TRANSACTION) e só depois que todas estão
+        preparadas vem o COMMIT PREPARED; falhas na cópia ou na preparação desfazem todas. Se um COMMIT
+        PREPARED falhar depois disso, a transação pendente fica no servidor (pg_prepared_xacts) e o seu id
+        é registrado no log.
+        Sem esse limite, cada fatia usa uma transação comum, confirmada só depois que todos os COPYs
+        terminam: falhas no COPY desfazem todas, mas uma falha no meio dos COMMITs deixa a carga parcial
+        (as fatias já confirmadas ficam na tabela e a quantidade é informada no retorno).
+        """
+        n_workers = n_workers or min(4, os.cpu_count() or 1)
+        table_name_qualified = f"{self.schema}.{table_name}"
+        logging.info(f"--- Iniciando carga paralela ({n_workers} conexões) para '{table_name_qualified}' ---")
+
+        try:
+            for conn in [c for c in self._conexoes_paralelas if c.closed]:
+                self._devolver(conn)
+            self._conexoes_paralelas = [c for c in self._conexoes_paralelas if not c.closed]
+            while len(self._conexoes_paralelas) < n_workers:
+                self._conexoes_paralelas.append(self._nova_conexao())
+        except Exception as e:
+            logging.error(f"Erro ao abrir as conexões da carga paralela: {e}")
+            return False, str(e)
+
+        fatias = [fatia for fatia in np.array_split(np.arange(len(df)), n_workers) if len(fatia)]
+        conexoes = self._conexoes_paralelas[:len(fatias)]
+        carga = uuid.uuid4().hex
+        duas_fases = False
+        iniciadas = []
+        try:
+            duas_fases = bool(conexoes) and self._aceita_duas_fases(conexoes[0], len(conexoes))
+            if not duas_fases:
+                logging.warning(f"max_prepared_transactions < {len(conexoes)}: carga paralela sem commit em duas "
+                                f"fases; uma falha durante os COMMITs pode deixar a carga parcial.")
+            for i, conn in enumerate(conexoes):
+                if duas_fases:
+                    conn.tpc_begin(conn.xid(0, f"etl_{carga}_{i}", table_name))
+                iniciadas.append(conn)
+            with ThreadPoolExecutor(max_workers=len(conexoes) or 1) as executor:
+                futuros = [executor.submit(self._copy, conn, df.iloc[fatia], table_name_qualified, binary)
+                           for conn, fatia in zip(conexoes, fatias)]
+                registros = sum(futuro.result() for futuro in futuros)
+            if duas_fases:
+                for conn in conexoes:
+                    conn.tpc_prepare()
+        except Exception as e:
+            for conn in iniciadas:
+                self._desfazer(conn, duas_fases)
+            logging.error(f"Erro no COPY paralelo na tabela {table_name}: {e}")
+            return False, str(e)
+
+        if not duas_fases:
+            # COPYs concluídos: confirma as fatias em sequência e, na primeira falha, desfaz as restantes
+            for i, conn in enumerate(conexoes):
+                try:
+                    conn.commit()
+                except Exception as e:
+                    for restante in conexoes[i:]:
+                        self._desfazer(restante, False)
+                    logging.error(f"COMMIT da fatia {i} falhou na tabela {table_name}: carga parcial, "
+                                  f"{i} de {len(conexoes)} fatias confirmadas: {e}")
+                    return False, f"Carga parcial: {i} de {len(conexoes)} fatias confirmadas. {e}"
+            return True, f"{registros} registros carregados com sucesso via COPY paralelo."
+
+        # Todas as fatias preparadas: a partir daqui o servidor garante que cada uma pode ser confirmada
+        pendentes = []
+        for i, conn in enumerate(conexoes):
+            try:
+                conn.tpc_commit()
+            except Exception as e:
+                pendentes.append(f"etl_{carga}_{i}: {e}")
+        if pendentes:
+            logging.error(f"COMMIT PREPARED pendente na tabela {table_name} (ver pg_prepared_xacts): {pendentes}")
+            return False, f"Transações preparadas pendentes: {' | '.join(pendentes)}"
+        return True, f"{registros} registros carregados com sucesso via COPY paralelo."
+
     def close(self):
-        if self.conn and not self.conn.closed:
-            self.conn.close()
-            logging.info("Conexão com PostgreSQL encerrada.")
+        """Devolve as conexões desta instância ao pool compartilhado."""
+        for conn in self._conexoes_paralelas:
+            self._devolver(conn)
+        self._conexoes_paralelas = []
+        if self.conn:
+            self._devolver(self.conn)
+            self.conn = None
+            logging.info("Conexão com PostgreSQL devolvida ao pool.")
 
 
 # --- SCRIPT DE TESTE PRINCIPAL ---
@@ -74,16 +690,30 @@ def executar_teste_isolado():
     # Substitua pelas colunas REAIS da sua tabela 'tab01'
     NOMES_DAS_COLUNAS = ['tipo_dia',	'fx_hora',	'mesref',	'disp_frota',	'viagens',	'tempo_percurso']
 
-    # Crie dados de teste. O número de itens deve ser o mesmo que o número de colunas.
-    DADOS_FALSOS = [['util', '04:00:00','2025/06','10','5','00:58:00']]
+    # Quantidade de linhas de teste (aumente para medir a carga com volumes maiores)
+    N_LINHAS = 1
+
+    # Crie dados de teste, uma coluna tipada por campo, já no tamanho final (sem listas de objetos str).
+    # Textos repetidos viram category (um código por linha); os textos mantêm o formato do banco.
+    def repetir(texto):
+        return pd.Categorical.from_codes(np.zeros(N_LINHAS, dtype=np.int8), categories=[texto])
+
+    DADOS_FALSOS = {
+        'tipo_dia': repetir('util'),
+        'fx_hora': repetir('04:00:00'),
+        'mesref': repetir('2025/06'),
+        'disp_frota': np.full(N_LINHAS, 10, dtype=np.int32),
+        'viagens': np.full(N_LINHAS, 5, dtype=np.int32),
+        'tempo_percurso': repetir('00:58:00'),
+    }
     # --- FIM DA ÁREA DE PREENCHIMENTO ---
 
-    if len(NOMES_DAS_COLUNAS) != len(DADOS_FALSOS[0]):
+    if set(NOMES_DAS_COLUNAS) != set(DADOS_FALSOS):
         print(
-            "ERRO DE CONFIGURAÇÃO: O número de colunas em NOMES_DAS_COLUNAS não é igual ao número de itens em DADOS_FALSOS.")
+            "ERRO DE CONFIGURAÇÃO: As colunas em NOMES_DAS_COLUNAS não são as mesmas colunas de DADOS_FALSOS.")
         return
 
-    df_teste = pd.DataFrame(DADOS_FALSOS, columns=NOMES_DAS_COLUNAS)
+    df_teste = pd.DataFrame(DADOS_FALSOS, columns=NOMES_DAS_COLUNAS, copy=False)
     print("DataFrame de teste a ser carregado:")
     print(df_teste)
     print("-" * 40)
@@ -100,7 +730,7 @@ def executar_teste_isolado():
     print("Iniciando o teste...")
     loader_isolado = PostgreSQLDataLoader(db_config)
 
-    if loader_isolado.conn:
+    if loader_isolado.connect():
         sucesso, mensagem = loader_isolado.load_dataframe_fast(df_teste, 'tab01')
 
         print("\n--- RESULTADO DO TESTE ---")